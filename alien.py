@@ -1,30 +1,41 @@
-import pygame
 from pygame.sprite import Sprite
 
+from asset_manager import assets
+
 class Alien(Sprite):
     """A class to represent a single alien in the fleet 
     """ 
 
-    def __init__(self, ai_game):
+    def __init__(self, ai_game, fleet=None, index=None):
         """Initialize the alien and set its starting position
 
         Args:
             ai_game (AlienInvasion): Game instance 
+            fleet (Fleet, optional): Fleet holding the alien's position
+            index (int, optional): Index of the alien in the fleet
         """        
         super().__init__()
         self.settings = ai_game.settings
         self.screen = ai_game.screen
+        self.screen_rect = self.screen.get_rect()
+        self.fleet = fleet
+        self.index = index
 
         #Load the alien image and set its rect attribute
-        self.image = pygame.image.load('images/alien.png')
-        self.image = pygame.transform.scale(self.image,
-                                             (self.settings.alien_scale_width,
-                                               self.settings.alien_scale_height))
+        self.image = assets.get_image('images/alien.png',
+                                      (self.settings.alien_scale_width,
+                                       self.settings.alien_scale_height))
         self.rect = self.image.get_rect()
 
-        #Start each new alien near the top left of the screen.
-        self.rect.x = self.rect.width
-        self.rect.y = self.rect.height
+        #Start each new alien near the top left of the screen or at its
+        #place in the fleet
+        if self.fleet is None:
+            self.rect.x = self.rect.width
+            self.rect.y = self.rect.height
+        else:
+            self.rect.topleft = self.fleet.position(self.index)
+            self.fleet.views[self.index] = self
+            self.fleet.sprites[self.index] = self
 
         #Store the alien's exact horizontal position.
         self.x = float(self.rect.x)
@@ -32,11 +43,22 @@ class Alien(Sprite):
     def check_edges(self) -> bool:
         """Return True if alien is at the edge of screen 
         """ 
-        screen_rect = self.screen.get_rect() 
-        return (self.rect.right >= screen_rect.right) or (self.rect.left <= 0)       
+        return ((self.rect.right >= self.screen_rect.right)
+                or (self.rect.left <= 0))
 
     def update(self):
         """Move the alien to the right
         """
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
-        self.rect.x = self.x
\ No newline at end of file
+        if self.fleet is None:
+            self.x += self.settings.alien_speed * self.settings.fleet_direction
+            self.rect.x = self.x
+        else:
+            self.rect.topleft = self.fleet.position(self.index)
+            self.x = float(self.rect.x)
+
+    def kill(self):
+        """Remove the alien from all groups and from its fleet
+        """
+        if self.fleet is not None:
+            self.fleet.kill(self.index)
+        super().kill()
@@ -1,8 +1,8 @@
+import argparse
+import random
 import sys
 import pygame
-from bullet import Bullet
-from random import randint
-from time import sleep
+from bullet import BulletPool
 import json
 import os
 
@@ -10,84 +10,283 @@ from settings import Settings
 from game_stats import GameStats
 from ship import Ship
 from alien import Alien
-from star import Star
+from fleet import Fleet
+from game_state import GameState
+from starfield import Starfield
 from button import Button
 from scoreboard import ScoreBoard
 from message import Message
+from renderer import DirtyRenderer
+from profiler import FrameProfiler, StartupProfiler
+from asset_manager import assets
+import surfaces
+from replay import Recorder
+from persistence import Persistence
+from input_handler import InputHandler
+from spectator import SpectatorServer
 
 
 class AlienInvasion:
     """
     Overall Class to manage game assets and behaviour
     """    
-    def __init__(self):
+    def __init__(self, headless=False, profile=False, trace_path=None,
+                 seed=None, record_path=None, profile_startup=False,
+                 settings=None, spectate_address=None):
         """
         Initialise the game and create game ressources  
+
+        Args:
+            headless (bool, optional): Run without a window. The game is
+                then advanced with step() instead of run_game().
+            profile (bool, optional): Time every frame and count the work
+                done in it
+            trace_path (str, optional): File the frame timings are
+                written to when the game quits
+            seed (int, optional): Seed for all randomness in the game,
+                a random seed is used if None
+            record_path (str, optional): File the input of the session
+                is recorded to for replay.py
+            profile_startup (bool, optional): Time the startup steps and
+                print a report after the first frame
+            settings (Settings, optional): Settings to play with, the
+                defaults if None
+            spectate_address (str, optional): 'host:port' or Unix socket
+                path to stream the game to spectators on
         """            
-        pygame.init()
+        self.startup = StartupProfiler(profile_startup)
+        self.headless = headless
+        if self.headless:
+            # Use SDL's dummy video driver, nothing is ever shown
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+        # Only initialise the pygame modules the game uses, the mixer alone
+        # can take a noticeable time to start
+        with self.startup.stage('pygame init'):
+            pygame.display.init()
+            pygame.font.init()
+
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
 
         self.clock = pygame.time.Clock()
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
+        self.profiler = FrameProfiler(
+            enabled=profile or trace_path is not None,
+            budget_ms=1000 / (self.settings.frame_rate
+                              or self.settings.update_rate),
+            export_path=trace_path)
 
         # self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
         # self.settings.screen_width = self.screen.get_rect().width
         # self.settings.screen_height = self.screen.get_rect().height
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
-        pygame.display.set_caption('Alien Invasion')
+        with self.startup.stage('display'):
+            if self.headless:
+                # Draw into an offscreen surface, a tiny display mode is
+                # only needed so images can be converted
+                if pygame.display.get_surface() is None:
+                    pygame.display.set_mode((1, 1))
+                self.screen = pygame.Surface(
+                    (self.settings.screen_width, self.settings.screen_height))
+            else:
+                self.screen = pygame.display.set_mode(
+                    (self.settings.screen_width, self.settings.screen_height))
+                pygame.display.set_caption('Alien Invasion')
+
+        # Keys and gamepad buttons are mapped to actions, input latency is
+        # measured when profiling
+        self.input = InputHandler(
+            self, measure_latency=self.profiler.enabled and not headless)
+        if not self.headless:
+            self.input.restrict_events()
         
         # Create an instance for tracking game statistics
-        self.stats = GameStats(self)
-        self.sb = ScoreBoard(self)
+        with self.startup.stage('stats and scoreboard'):
+            self.stats = GameStats(self)
+            self.sb = ScoreBoard(self)
+            # Headless games are simulations, they never save anything
+            self.persistence = Persistence(self, enabled=not self.headless)
+
+        with self.startup.stage('ship and fleet'):
+            self.ship = Ship(self) 
+            self.bullets = pygame.sprite.Group()
+            self.bullet_pool = BulletPool(self)
+            self.aliens = pygame.sprite.Group()
+            self.fleet = Fleet(self)
+            self._create_fleet()
+
+        # The sky, the pause button and the message are built on first use.
+        # The sky's seed is drawn now so it doesn't depend on when that is.
+        self._starfield = None
+        self._starfield_seed = self.rng.randrange(2**32)
+        self._pause_button = None
+        self._message = None
+        self._message_loaded = False
+
+        self.state = GameState()
+        self.frame = 0
+        # Length of one fixed update in seconds
+        self.dt = 1 / self.settings.update_rate
 
-        self.ship = Ship(self) 
-        self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
-        self.stars = pygame.sprite.Group()
+        # Make the Play button.
+        with self.startup.stage('play button'):
+            self.play_button = Button(self, 'Play')
 
-        self._create_fleet()
-        self._create_starry_sky()
-        self.game_active = False
-        self.game_paused = False
+        if record_path is not None:
+            self.recorder = Recorder(record_path, self.seed)
+        else:
+            self.recorder = None
 
-        # Make the Play button.
-        self.play_button = Button(self, 'Play')
-        self.pause_button = Button(self, 'Pause')
-        
-        # Prepare Messages
-        self._load_msg('bday_msg.json')
+        if spectate_address is not None:
+            self.spectators = SpectatorServer(self, spectate_address)
+        else:
+            self.spectators = None
+
+        if self.settings.render_mode == 'dirty':
+            self.renderer = DirtyRenderer(self)
+        else:
+            self.renderer = None
         
 
     def run_game(self) -> None:
         """
         Start the main loop for the game
+
+        The game is updated in fixed steps of self.dt for the time that
+        passed, however many frames are drawn. Frames are drawn in between
+        the last two updates, so motion stays smooth at any frame rate.
         """
+        # Time not yet simulated, in seconds
+        lag = 0.0
         while True:
-            self._check_events()
+            self.profiler.begin_frame()
+            misses = assets.misses
+            allocated = surfaces.allocated
+
+            with self.profiler.phase('events'):
+                self._check_events()
+
+            while lag >= self.dt:
+                self._update_game()
+                lag -= self.dt
+
+            with self.profiler.phase('screen'):
+                self._update_screen(lag / self.dt)
+
+            self._count_frame(misses, allocated)
+            self.profiler.end_frame()
+            if self.startup.enabled and self.startup.frame_done():
+                print(self.startup.report())
+
+            # Don't try to catch up on more than a quarter second after a
+            # stall, the game would freeze while updating
+            lag += min(self.clock.tick(self.settings.frame_rate) / 1000, 0.25)
+
+
+    def step(self, n_frames=1, inputs=None) -> None:
+        """Advance the simulation by n_frames fixed timesteps without
+        rendering or waiting for the clock
 
-            if self.game_active and not self.game_paused:
-                self.ship.update()
+        Args:
+            n_frames (int, optional): Number of frames to simulate
+            inputs (sequence, optional): One list of pygame events per
+                frame. Frames without an entry get no input.
+        """
+        for i in range(n_frames):
+            self.profiler.begin_frame()
+            misses = assets.misses
+            allocated = surfaces.allocated
+
+            if inputs is not None and i < len(inputs):
+                self._check_events(inputs[i])
+            self._update_game()
+
+            self._count_frame(misses, allocated)
+            self.profiler.end_frame()
+
+
+    def _count_frame(self, misses, allocated) -> None:
+        """Count the sprites alive, the asset cache misses and the surfaces
+        allocated this frame
+
+        Args:
+            misses (int): Asset cache misses at the start of the frame
+            allocated (int): Surfaces allocated at the start of the frame
+        """
+        self.profiler.count('sprites_alive',
+                            len(self.aliens) + len(self.bullets))
+        self.profiler.count('asset_cache_misses', assets.misses - misses)
+        self.profiler.count('surfaces_allocated',
+                            surfaces.allocated - allocated)
+
+
+    def _update_game(self) -> None:
+        """
+        Advance the game state by a single frame
+        """
+        self.frame += 1
+        self._store_previous_positions()
+        # Only a sky that was drawn already needs to scroll, headless games
+        # never build one
+        if self._starfield is not None and self._starfield.scrolling:
+            self._starfield.update(self.dt)
+        self.state.update(self.dt * 1000)
+        self.input.updated_game()
+        if self.state.playing:
+            with self.profiler.phase('ship'):
+                self.ship.update(self.dt)
+            with self.profiler.phase('bullets'):
                 self._update_bullets()
+            with self.profiler.phase('aliens'):
                 self._update_aliens()
+            self.persistence.update(self.dt * 1000)
 
-            self._update_screen()
-            self.clock.tick(60)
+        if self.spectators is not None:
+            self.spectators.publish()
             
     
-    def _check_events(self) -> None:
+    def _store_previous_positions(self) -> None:
+        """Remember where everything was before an update, frames are
+        drawn in between the previous and the current position
+        """
+        self.ship.prev_x = self.ship.x
+        self.fleet.store_previous()
+        self.bullet_pool.store_previous()
+
+
+    def _check_events(self, events=None) -> None:
         """
         Respond to keypresses and mouse events 
+
+        Args:
+            events (list, optional): Events to handle instead of the
+                pygame event queue
         """ 
-        for event in pygame.event.get():
+        if events is None:
+            events = pygame.event.get()
+
+        # Translate first, so the frame is recorded before any action runs
+        handled = [(event, self.input.actions(event))
+                   if event.type not in (pygame.QUIT, pygame.MOUSEBUTTONDOWN)
+                   else (event, []) for event in events]
+        if self.recorder is not None:
+            # The events are handled before the upcoming update. Quitting
+            # ends the recording and is not stored.
+            self.recorder.record_frame(
+                self.frame + 1,
+                [event for event, actions in handled
+                 if all(action != 'quit' for action, _ in actions)])
+
+        for event, actions in handled:
             if event.type == pygame.QUIT:
                 self._quit_game()  
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
+                self._check_play_button(event.pos)
+            else:
+                for action, pressed in actions:
+                    self._check_action(action, pressed)
 
 
     def _check_play_button(self, mouse_pos):
@@ -98,98 +297,108 @@ class AlienInvasion:
         """      
         button_clicked = self.play_button.rect.collidepoint(mouse_pos)
         
-        if button_clicked and not self.game_active:
+        if button_clicked and not self.state.active:
             self._start_new_game()
 
 
-    def _update_screen(self) -> None:
+    def _update_screen(self, alpha=1.0) -> None:
         """
         Update images on the screen, and flip to the new screen
+
+        Args:
+            alpha (float, optional): Draw moving objects this far between
+                their previous (0) and current (1) position
         """          
-        #create background
-        self.screen.fill(self.settings.bg_color)
+        if self.renderer is not None:
+            presented = self.renderer.render(lambda: self._draw_scene(alpha))
+        else:
+            #create background filled with stars
+            self.starfield.blitme()
+
+            self._draw_scene(alpha)
         
-        #fill background with stars
-        self.stars.draw(self.screen)  
+            pygame.display.flip()
+            presented = True
+        # Skipped frames showed nothing new, inputs wait for the next one
+        if presented:
+            self.input.frame_presented()
+
+
+    def _draw_scene(self, alpha=1.0) -> list:
+        """Draw everything in front of the background
+
+        Args:
+            alpha (float, optional): Draw moving objects this far between
+                their previous (0) and current (1) position
 
+        Returns:
+            list: Rects drawn to
+        """
         #draw shot bullets
-        for bullet in self.bullets:
-            bullet.draw_bullet()
-        
+        rects = self.bullet_pool.draw(alpha)
         
-        self.ship.blitme()
-        self.aliens.draw(self.screen)
-        self.sb.show_score()
+        rects.append(self.ship.blitme(alpha))
+        rects.extend(self.fleet.draw(self.screen, alpha))
+        rects.extend(self.sb.show_score())
 
         # Draw Pause Button when paused
-        if self.game_paused:
-            self.message.draw_msg()
+        if self.state.paused and self.message is not None:
+            rects.extend(self.message.draw_msg())
             # self.pause_button.draw_button()
 
         # Draw the play button if the game is inactive
-        if not self.game_active:
-            self.play_button.draw_button()
+        if not self.state.active:
+            rects.extend(self.play_button.draw_button())
 
-        
-        pygame.display.flip()
+        rects.extend(self.profiler.draw_overlay(self.screen))
+        self.profiler.count('blits', len(rects))
+        return rects
 
 
-    def _check_keydown_events(self, event):
+    def _check_action(self, action, pressed):
         """
-        Respond do keypresses
+        Respond to a bound key or gamepad button
 
         Args:
-            event (pygame keydown event): keypress event 
+            action (str): Action from the binding tables
+            pressed (bool): True when pressed, False when released
         """        
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = True
+        if action == 'right':
+            self.ship.moving_right = pressed
+
+        elif action == 'left':
+            self.ship.moving_left = pressed
 
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = True
+        elif not pressed:
+            return
 
-        elif event.key == pygame.K_SPACE:
+        elif action == 'fire':
             self._fire_bullet()
 
-        elif event.key == pygame.K_r:
+        elif action == 'new_game':
             self._start_new_game()
 
-        elif event.key == pygame.K_p:
+        elif action == 'pause':
             self._pause_game()
 
-        elif event.key == pygame.K_q:
+        elif action == 'quit':
             self._quit_game()
-            
-
-    def _check_keyup_events(self, event) -> None:
-        """
-        Respon do key releases
 
-        Args:
-            event (pygame keyup event): key release event 
-        """     
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False 
+        elif action == 'overlay':
+            self.profiler.show_overlay = not self.profiler.show_overlay
 
     
     def _fire_bullet(self) -> None:
         """Create a new bullet and add it to the bullets group
         """ 
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet) 
+        self.bullet_pool.fire()
 
 
     def _update_bullets(self) -> None:
         """Update position of bullets and get rid of old bullets
         """              
-        self.bullets.update()
-
-        # delete off-screen bullets
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom < 0:
-                self.bullets.remove(bullet)
+        # move bullets and recycle off-screen bullets
+        self.bullet_pool.update(self.dt)
         
         self._check_bullet_alien_collisions()
         
@@ -197,8 +406,8 @@ class AlienInvasion:
     def _check_bullet_alien_collisions(self):
         """Resond to bullet-alien collisions
         """
-        collisions = pygame.sprite.groupcollide(
-            self.bullets, self.aliens, not self.settings.bullets_piercing, True)
+        collisions = self.fleet.collide_bullets(
+            self.bullets, not self.settings.bullets_piercing, True)
 
         if collisions:
             for aliens in collisions.values(): 
@@ -213,28 +422,18 @@ class AlienInvasion:
     def _create_fleet(self):
         """Creates the fleet of aliens
         """  
-        #Create an alien and keep adding aliens until there's no room left
-        #Spacing between aliens is one alien_width       
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-
-        current_x, current_y  = alien_width, alien_height
-        while current_y < (self.settings.screen_height - 3 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += 2 * alien_width
-
-            current_x = alien_width       
-            current_y += 2 * alien_height
+        #Lay out the fleet until there's no room left, then add a sprite
+        #for every alien to draw it
+        self.fleet.build()
+        for index, alive in enumerate(self.fleet.alive):
+            if alive:
+                self._create_alien(index)
 
 
-    def _create_alien(self, x_position, y_position):
-        """create an alien and place it in the row
+    def _create_alien(self, index):
+        """create an alien sprite for the alien at index in the fleet
         """ 
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        new_alien.rect.x = x_position 
-        new_alien.rect.y = y_position
+        new_alien = Alien(self, self.fleet, index)
         self.aliens.add(new_alien)
 
 
@@ -242,11 +441,11 @@ class AlienInvasion:
         """Update the positions of all aliens in the fleet
         """
         self._check_fleet_edges()
-        self.aliens.update()  
+        self.fleet.move(self.dt)
 
         # Look for alien-ship collisions
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
-                self._ship_hit()
+        if self.fleet.collide_rect(self.ship.rect):
+            self._ship_hit()
         
         # Looking for aliens hitting the bottom of the screen
         self._check_aliens_bottom()
@@ -262,89 +461,78 @@ class AlienInvasion:
             self._reset_level()
             self.sb.prep_ships()
 
-            # Pause
-            sleep(0.5)
+            # Give the player a moment before the next round starts
+            self.state.set(GameState.RESPAWNING, self.settings.respawn_time)
         else:
-            self.game_active = False
+            self.state.set(GameState.GAME_OVER)
             pygame.mouse.set_visible(True)
+            self.persistence.record_game()
 
 
     def _check_aliens_bottom(self):
         """Check if any aliens have reached the bottom of the screen.
         """
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                #Tret this the same way, as if the ship is hit
-                self._ship_hit()
-                break                
+        if self.fleet.reached_bottom():
+            #Tret this the same way, as if the ship is hit
+            self._ship_hit()
 
 
     def _check_fleet_edges(self):
         """Respond appropriately if any aliens have reached an edge
         """
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.fleet.check_edges():
+            self._change_fleet_direction()
 
 
     def _change_fleet_direction(self):
         """Drop the entire fleet and change the fleet's direction
         """
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        self.fleet.drop()
         self.settings.fleet_direction *= -1        
 
 
+    @property
+    def starfield(self):
+        """The starry sky, created on first use
+        """
+        if self._starfield is None:
+            self._create_starry_sky()
+        return self._starfield
+
+
     def _create_starry_sky(self):
         """Creates randomly placed stars in the background
         """
-        star_count = 0
-
-        while star_count < self.settings.stars_allowed:
-            
-            # Set random position
-            x_position = randint(0, self.screen.get_width())
-            y_position = randint(0, self.screen.get_width())
+        with self.startup.stage('starfield'):
+            self._starfield = Starfield(self, seed=self._starfield_seed)
 
-            # Set scaling, width and height should be equal
-            width = randint(1, self.settings.star_scale_width)
-            height = width
-
-            # Rotate by random angle
-            rotation_angle  = randint(0, 45)
-            
-            
-            self._create_star(x_position, y_position, width, height,
-                              rotation_angle) 
-            
-            star_count += 1
 
+    @property
+    def pause_button(self):
+        """The Pause button, created on first use
+        """
+        if self._pause_button is None:
+            with self.startup.stage('pause button'):
+                self._pause_button = Button(self, 'Pause')
+        return self._pause_button
 
-    def _create_star(self, x_position, y_position, width,
-                      height, rotation_angle):
-        """Create a star at the given position in the backgrond
 
-        Args:
-            x_position (int): x-Position on the screen of the star
-            y_position (int): y-Position on the screen of the star
-            width (int): Scale the star to given width
-            height (int): Scale the star to given height
-            rotation_angle (int): rotate the star around its axis by given angle
+    @property
+    def message(self):
+        """The message shown while paused, loaded on first use or None
         """
-        new_star = Star(self)
-        new_star.rect.x = x_position
-        new_star.rect.y = y_position
-        new_star.scale(width, height)
-        new_star.rotate(rotation_angle)
-        self.stars.add(new_star)
+        if not self._message_loaded:
+            self._message_loaded = True
+            with self.startup.stage('message'):
+                self._load_msg('bday_msg.json')
+        return self._message
 
 
     def _reset_level(self):
         """Resets the game to the initial state for a new round
         """        
         # Get rid of remaining bullets and aliens.
-        self.bullets.empty()
+        self.bullet_pool.clear()
         self.aliens.empty()
 
         # Create a new fleet and center the ship
@@ -355,7 +543,7 @@ class AlienInvasion:
         """Create next level
         """
         # Destroy existing bullets and create a new fleet.
-        self.bullets.empty()
+        self.bullet_pool.clear()
         self._create_fleet()
         self.settings.increase_speed()
 
@@ -363,6 +551,10 @@ class AlienInvasion:
         self.stats.level += 1
         self.sb.prep_level()       
 
+        # Show the new fleet for a moment before it starts moving
+        self.state.set(GameState.LEVEL_TRANSITION,
+                       self.settings.level_transition_time)
+
 
     def _start_new_game(self):
         """Starts a new game
@@ -371,8 +563,7 @@ class AlienInvasion:
         self.sb.prep_score()
         self.sb.prep_level()
         self.sb.prep_ships()
-        self.game_active = True
-        self.game_paused = False
+        self.state.set(GameState.PLAYING)
         self._reset_level()
         self.settings.initialize_dynamic_settings()
         # Hide the mouse cursor
@@ -381,18 +572,25 @@ class AlienInvasion:
     def _pause_game(self):
         """Pause the game on demand when game is active
         """         
-        if self.game_active:
-            if self.game_paused:
-                self.game_paused = False
-            else:     
-                self.game_paused = True
+        self.state.toggle_pause()
 
     def _quit_game(self):
         """Saves important data before quitting the game
         """
-        with open("high_score.json", "w") as json_datei:
-            json.dump(self.stats.high_score, json_datei)
-        
+        self.persistence.save_high_score()
+        self.persistence.close()
+
+        if self.input.measure_latency:
+            print(self.input.report())
+        # Steps like the pause message are only timed once they are used
+        if self.startup.enabled and self.startup.report(lazy=True):
+            print(self.startup.report(lazy=True))
+
+        self.profiler.export()
+        if self.recorder is not None:
+            self.recorder.close(self.frame)
+        if self.spectators is not None:
+            self.spectators.close()
         sys.exit()
 
     def _load_msg(self, msg_path):
@@ -406,12 +604,44 @@ class AlienInvasion:
             with open(msg_path, "r") as json_datei:
                 msg = json.load(json_datei)
             
-            self.message = Message(self, msg)
+            self._message = Message(self, msg)
         
 
                 
      
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play Alien Invasion')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every frame, F3 shows the overlay')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='write frame timings to PATH on quit '
+                             '(.csv for CSV, Chrome trace JSON otherwise)')
+    parser.add_argument('--seed', type=int,
+                        help='seed for all randomness in the game')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record the session to PATH for replay.py')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='print how long each startup step took')
+    parser.add_argument('--fps', type=int, metavar='N',
+                        help='frames drawn per second, 0 for uncapped')
+    parser.add_argument('--spectate', metavar='ADDRESS',
+                        help="stream the game to spectator.py clients on "
+                             "'host:port' or a Unix socket path")
+    parser.add_argument('--player', metavar='NAME',
+                        help='name the leaderboard lists the games under')
+    args = parser.parse_args()
+
+    # Settings given on the command line are known before the game is
+    # built, the frame budget of the profiler depends on the frame rate
+    settings = Settings()
+    if args.fps is not None:
+        settings.frame_rate = args.fps
+    if args.player is not None:
+        settings.player_name = args.player
+
     #Make a game instance and run the game
-    ai = AlienInvasion()
+    ai = AlienInvasion(profile=args.profile, trace_path=args.trace,
+                       seed=args.seed, record_path=args.record,
+                       profile_startup=args.profile_startup,
+                       settings=settings, spectate_address=args.spectate)
     ai.run_game()
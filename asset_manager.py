@@ -0,0 +1,151 @@
+import json
+import os
+from collections import OrderedDict
+
+import pygame
+
+from surfaces import counted
+
+
+# Manifest written by build_atlas.py
+ATLAS_MANIFEST = 'images/atlas.json'
+
+
+def atlas_key(path, size):
+    """Return the manifest key of an image at a given size
+
+    Args:
+        path (str): Path to the source image
+        size (tuple): (width, height) of the image in the atlas
+    """
+    return f"{path}@{size[0]}x{size[1]}"
+
+
+class AssetManager:
+    """A class to load, convert and scale images only once per process
+
+    Images are cached by (path, size, angle). The cache is bounded and
+    evicts the least recently used surface when it is full.
+
+    If an atlas built by build_atlas.py exists, images at the sizes it
+    holds are cut out of the single atlas image instead of being decoded
+    and scaled from their source files.
+    """
+
+    def __init__(self, max_entries=128, atlas_manifest=ATLAS_MANIFEST):
+        """Initialize an empty image cache
+
+        Args:
+            max_entries (int): Maximum number of cached surfaces
+            atlas_manifest (str, optional): Manifest of the atlas to use,
+                None to always load the source files
+        """
+        self.max_entries = max_entries
+        self.atlas_manifest = atlas_manifest
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.atlas = None
+        self.regions = None
+
+    def get_image(self, path, size=None, angle=0):
+        """Return the image at path, scaled to size and rotated by angle
+
+        The returned surface is shared between all callers and must not
+        be drawn on.
+
+        Args:
+            path (str): Path to the image file
+            size (tuple, optional): (width, height) to scale the image to
+            angle (int, optional): Rotation angle in degrees
+
+        Returns:
+            pygame.Surface: The cached surface
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        key = (path, size, angle)
+
+        image = self._images.get(key)
+        if image is not None:
+            self.hits += 1
+            self._images.move_to_end(key)
+            return image
+
+        self.misses += 1
+        image = self._build_image(path, size, angle)
+        self._images[key] = image
+        if len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+        return image
+
+    def _build_image(self, path, size, angle):
+        """Decode, convert, scale and rotate a single image
+
+        Args:
+            path (str): Path to the image file
+            size (tuple): (width, height) or None to keep the source size
+            angle (int): Rotation angle in degrees
+        """
+        if self.regions is None:
+            self._load_atlas()
+        region = self.regions.get(atlas_key(path, size)) if size else None
+
+        if region is not None:
+            # Shares its pixels with the atlas
+            image = self.atlas.subsurface(region)
+            size = None
+        elif size is not None or angle:
+            # Derived images start from the cached, converted source image
+            image = self.get_image(path)
+        else:
+            image = counted(pygame.image.load(path))
+            # convert_alpha needs a display mode, which is not set yet
+            # for surfaces loaded before the window is opened
+            if pygame.display.get_surface() is not None:
+                image = counted(image.convert_alpha())
+            return image
+
+        if size is not None:
+            image = counted(pygame.transform.scale(image, size))
+        if angle:
+            image = counted(pygame.transform.rotate(image, angle))
+        return image
+
+    def _load_atlas(self):
+        """Load the atlas image and its regions if there is one
+        """
+        self.regions = {}
+        if self.atlas_manifest is None:
+            return
+        try:
+            with open(self.atlas_manifest) as manifest_file:
+                manifest = json.load(manifest_file)
+            image_path = os.path.join(os.path.dirname(self.atlas_manifest),
+                                      manifest['image'])
+            atlas = counted(pygame.image.load(image_path))
+        except (OSError, ValueError, KeyError, pygame.error):
+            # No usable atlas, load the source files
+            return
+
+        if pygame.display.get_surface() is not None:
+            atlas = counted(atlas.convert_alpha())
+        self.atlas = atlas
+        self.regions = {key: pygame.Rect(rect)
+                        for key, rect in manifest['regions'].items()}
+
+    def clear(self):
+        """Drop all cached images and the atlas and reset the counters
+        """
+        self._images.clear()
+        self.atlas = None
+        self.regions = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._images)
+
+
+# Process-wide cache shared by all sprites
+assets = AssetManager()
@@ -0,0 +1,455 @@
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from stress import stress_settings
+from world_state import WorldState
+
+
+def _make_game(alien_size=None):
+    """Create a headless game, optionally with smaller aliens
+
+    Args:
+        alien_size (tuple, optional): (width, height) of a single alien
+    """
+    ai_game = AlienInvasion(headless=True)
+    if alien_size is not None:
+        ai_game.settings.alien_scale_width = alien_size[0]
+        ai_game.settings.alien_scale_height = alien_size[1]
+        ai_game.aliens.empty()
+        ai_game._create_fleet()
+    return ai_game
+
+
+def _spray_bullets(ai_game, count, seed=0):
+    """Fill the bullet group with count randomly placed bullets
+
+    Args:
+        ai_game (AlienInvasion): Headless game instance
+        count (int): Number of bullets
+        seed (int, optional): Seed for the bullet positions
+    """
+    rng = random.Random(seed)
+    ai_game.bullet_pool.clear()
+    ai_game.settings.bullets_allowed = count
+    for _ in range(count):
+        ai_game.bullet_pool.fire(
+            (rng.randint(0, ai_game.settings.screen_width),
+             rng.randint(0, ai_game.settings.screen_height)))
+
+
+def bench_collisions(repeat=5, number=20):
+    """Compare the fleet broadphase with pygame.sprite.groupcollide
+
+    Args:
+        repeat (int, optional): Number of timing runs, the best is kept
+        number (int, optional): Collision checks per timing run
+    """
+    print(f"{'aliens':>8} {'bullets':>8} {'groupcollide':>14} "
+          f"{'fleet':>10} {'speedup':>8}")
+    for alien_size in [(60, 40), (20, 14), (8, 6), (4, 3)]:
+        ai_game = _make_game(alien_size)
+        for bullet_count in [3, 30, 300]:
+            _spray_bullets(ai_game, bullet_count)
+
+            brute = min(timeit.repeat(
+                lambda: pygame.sprite.groupcollide(
+                    ai_game.bullets, ai_game.aliens, False, False),
+                repeat=repeat, number=number)) / number
+            fleet = min(timeit.repeat(
+                lambda: ai_game.fleet.collide_bullets(
+                    ai_game.bullets, False, False),
+                repeat=repeat, number=number)) / number
+
+            print(f"{len(ai_game.aliens):>8} {bullet_count:>8} "
+                  f"{brute * 1e3:>11.3f} ms {fleet * 1e3:>7.3f} ms "
+                  f"{brute / fleet:>7.1f}x")
+
+
+def bench_bullet_draw(repeat=5, number=20):
+    """Compare drawing bullets one by one with the batched bullet pool
+
+    Args:
+        repeat (int, optional): Number of timing runs, the best is kept
+        number (int, optional): Draws per timing run
+    """
+    print(f"{'bullets':>8} {'draw.rect':>16} {'blits':>16} {'speedup':>8}")
+    ai_game = _make_game()
+    pool = ai_game.bullet_pool
+    for bullet_count in [3, 100, 1000, 10000]:
+        _spray_bullets(ai_game, bullet_count)
+
+        single = min(timeit.repeat(
+            lambda: [bullet.draw_bullet() for bullet in pool.active],
+            repeat=repeat, number=number)) / number
+        batched = min(timeit.repeat(
+            lambda: pool.draw(), repeat=repeat, number=number)) / number
+
+        # Cost per 1,000 bullets
+        scale = 1e3 / bullet_count
+        print(f"{bullet_count:>8} {single * scale * 1e3:>9.3f} ms/1k "
+              f"{batched * scale * 1e3:>9.3f} ms/1k "
+              f"{single / batched:>7.1f}x")
+
+
+BENCHMARKS = {
+    'collisions': bench_collisions,
+    'bullet_draw': bench_bullet_draw,
+}
+
+
+def _fleet_game(aliens):
+    """Create a headless game with a fleet of about the given size
+
+    Args:
+        aliens (int): Number of places in the formation
+    """
+    settings = stress_settings(aliens, 1000, 600)
+    return AlienInvasion(headless=True, seed=0, settings=settings)
+
+
+def case_create_fleet(aliens):
+    """Lay out the fleet and create its sprites
+
+    Args:
+        aliens (int): Number of places in the formation
+    """
+    ai_game = _fleet_game(aliens)
+    return ai_game.aliens.empty, ai_game._create_fleet
+
+
+def case_update_aliens(aliens):
+    """Move the fleet by one update
+
+    Args:
+        aliens (int): Number of places in the formation
+    """
+    ai_game = _fleet_game(aliens)
+    start = WorldState.capture(ai_game)
+    return lambda: start.restore(ai_game), ai_game._update_aliens
+
+
+def case_update_bullets(bullets):
+    """Move the bullets and collide them with the fleet
+
+    Args:
+        bullets (int): Number of bullets in flight
+    """
+    ai_game = _fleet_game(1000)
+    _spray_bullets(ai_game, bullets)
+    start = WorldState.capture(ai_game)
+    return lambda: start.restore(ai_game), ai_game._update_bullets
+
+
+def case_update_screen(stars):
+    """Draw a whole frame
+
+    Args:
+        stars (int): Number of stars in the sky
+    """
+    ai_game = AlienInvasion(headless=True, seed=0)
+    ai_game.settings.stars_allowed = stars
+    _spray_bullets(ai_game, 3)
+    return None, ai_game._update_screen
+
+
+def case_starry_sky(stars):
+    """Bake the starfield background
+
+    Args:
+        stars (int): Number of stars in the sky
+    """
+    ai_game = AlienInvasion(headless=True, seed=0)
+    ai_game.settings.stars_allowed = stars
+    return None, ai_game.starfield._bake
+
+
+def case_prep_score(digits):
+    """Render a score that changed
+
+    Args:
+        digits (int): Number of digits of the score
+    """
+    ai_game = AlienInvasion(headless=True, seed=0)
+    stats, sb = ai_game.stats, ai_game.sb
+    stats.score = 10 ** (digits - 1)
+
+    def run():
+        stats.score += 10
+        sb.prep_score()
+    return None, run
+
+
+def case_prep_ships(ships):
+    """Render the remaining ships after a change
+
+    Args:
+        ships (int): Number of ships left
+    """
+    ai_game = AlienInvasion(headless=True, seed=0)
+    stats, sb = ai_game.stats, ai_game.sb
+
+    def run():
+        stats.ships_left = ships if stats.ships_left != ships else 0
+        sb.prep_ships()
+    return None, run
+
+
+# Case name, its parameter and the values the parameter is scaled over.
+# A case builds a headless game and returns a setup, called untimed before
+# every call or None, and the code to time.
+SUITE = [
+    ('create_fleet', case_create_fleet, 'aliens', [50, 1000, 10000]),
+    ('update_aliens', case_update_aliens, 'aliens', [50, 1000, 10000]),
+    ('update_bullets', case_update_bullets, 'bullets', [3, 100, 1000]),
+    ('update_screen', case_update_screen, 'stars', [50, 500, 5000]),
+    ('starry_sky', case_starry_sky, 'stars', [50, 500, 5000]),
+    ('prep_score', case_prep_score, 'digits', [3, 7]),
+    ('prep_ships', case_prep_ships, 'ships', [2, 10]),
+]
+
+
+def _measure(setup, run, samples, min_time=0.002):
+    """Return the seconds per call of run over a number of samples
+
+    Without a setup, each sample repeats run until it takes at least
+    min_time. With a setup, it is called untimed before every call.
+
+    Args:
+        setup (callable): Puts the game back before a call, or None
+        run (callable): Code to time
+        samples (int): Number of samples
+        min_time (float, optional): Shortest sample in seconds
+    """
+    if setup is not None:
+        times = []
+        # Like timeit, keep the garbage collector out of the timings
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(samples + 1):
+                setup()
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        # The first call warms up caches
+        return times[1:]
+
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    number = max(1, math.ceil(number * min_time / 0.2))
+    return [t / number for t in timer.repeat(samples, number)]
+
+
+def run_suite(samples=20, names=None):
+    """Time every case of the suite at all of its parameter values
+
+    Args:
+        samples (int, optional): Samples per case and value
+        names (list, optional): Cases to run, all by default
+
+    Returns:
+        dict: Environment information and the samples of every case
+    """
+    results = {}
+    for name, case, param, values in SUITE:
+        if names and name not in names:
+            continue
+        for value in values:
+            key = f"{name}[{param}={value}]"
+            setup, run = case(value)
+            times = _measure(setup, run, samples)
+            results[key] = {
+                'samples': times,
+                'mean': statistics.fmean(times),
+                'stdev': statistics.stdev(times),
+            }
+            print(f"{key:<36} {results[key]['mean'] * 1e6:>12.1f} us "
+                  f"+- {results[key]['stdev'] * 1e6:.1f}")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def _betacf(a, b, x):
+    """Evaluate the continued fraction of the incomplete beta function
+    with Lentz's method
+
+    Args:
+        a (float): First shape parameter
+        b (float): Second shape parameter
+        x (float): Point between 0 and 1
+    """
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x
+                          / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1) < 1e-12:
+            break
+    return h
+
+
+def _t_test_p(t, df):
+    """Return the two-sided p-value of a t statistic
+
+    Args:
+        t (float): t statistic
+        df (float): Degrees of freedom
+    """
+    x = df / (df + t * t)
+    if x >= 1:
+        return 1.0
+    if x <= 0:
+        return 0.0
+    a, b = df / 2, 0.5
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    # Regularized incomplete beta I_x(a, b), which is the p-value
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1 - front * _betacf(b, a, 1 - x) / b
+
+
+def welch_t_test(old, new):
+    """Compare two samples with Welch's t-test
+
+    Args:
+        old (list): Samples of the baseline
+        new (list): Samples of the new run
+
+    Returns:
+        float: Two-sided p-value of the means being equal
+    """
+    var_old = statistics.variance(old) / len(old)
+    var_new = statistics.variance(new) / len(new)
+    if var_old + var_new == 0:
+        return 1.0 if statistics.fmean(old) == statistics.fmean(new) else 0.0
+    t = (statistics.fmean(new) - statistics.fmean(old)) / math.sqrt(
+        var_old + var_new)
+    df = (var_old + var_new) ** 2 / (var_old ** 2 / (len(old) - 1)
+                                     + var_new ** 2 / (len(new) - 1))
+    return _t_test_p(t, df)
+
+
+def compare(baseline, results, alpha=0.01, threshold=0.1):
+    """Print the change of every case and flag significant regressions
+
+    Args:
+        baseline (dict): Suite results to compare against
+        results (dict): New suite results
+        alpha (float, optional): Significance level of the t-test
+        threshold (float, optional): Relative slowdown that is ignored
+            even if it is significant
+
+    Returns:
+        int: Number of regressions
+    """
+    regressions = 0
+    print(f"{'case':<36} {'baseline':>12} {'new':>12} {'change':>8} "
+          f"{'p':>8}")
+    for key, new in results['results'].items():
+        old = baseline['results'].get(key)
+        if old is None:
+            print(f"{key:<36} {'':>12} {new['mean'] * 1e6:>9.1f} us  (new)")
+            continue
+        change = new['mean'] / old['mean'] - 1
+        p = welch_t_test(old['samples'], new['samples'])
+        verdict = ''
+        if p < alpha and abs(change) > threshold:
+            if change > 0:
+                verdict = 'REGRESSION'
+                regressions += 1
+            else:
+                verdict = 'faster'
+        print(f"{key:<36} {old['mean'] * 1e6:>9.1f} us "
+              f"{new['mean'] * 1e6:>9.1f} us {change:>+8.1%} {p:>8.4f} "
+              f"{verdict}")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark hot paths of Alien Invasion headlessly')
+    parser.add_argument('names', nargs='*', metavar='name',
+                        help=f"Benchmarks to run: {', '.join(BENCHMARKS)}. "
+                             "All by default. With --suite, the suite "
+                             "cases to run.")
+    parser.add_argument('--suite', action='store_true',
+                        help='run the benchmark suite instead')
+    parser.add_argument('--samples', type=int, default=20,
+                        help='samples per suite case, default 20')
+    parser.add_argument('--output', metavar='PATH',
+                        help='write the suite results to a JSON file, '
+                             'which can serve as a baseline')
+    parser.add_argument('--compare', nargs='+', metavar='PATH',
+                        help='compare the suite with a baseline: '
+                             'BASELINE to run the suite now, or '
+                             'BASELINE RESULTS to compare two files')
+    parser.add_argument('--alpha', type=float, default=0.01,
+                        help='significance level, default 0.01')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdowns below this fraction are not '
+                             'flagged, default 0.1')
+    args = parser.parse_args()
+
+    if args.suite or args.compare:
+        if args.compare and len(args.compare) > 2:
+            parser.error('--compare takes one or two files')
+        suite_names = [name for name, *_ in SUITE]
+        for name in args.names:
+            if name not in suite_names:
+                parser.error(f"unknown suite case '{name}'")
+
+        if args.compare and len(args.compare) == 2:
+            with open(args.compare[1]) as results_file:
+                results = json.load(results_file)
+        else:
+            results = run_suite(args.samples, args.names)
+        if args.output:
+            with open(args.output, 'w') as results_file:
+                json.dump(results, results_file, indent=1)
+
+        if args.compare:
+            with open(args.compare[0]) as baseline_file:
+                baseline = json.load(baseline_file)
+            print()
+            regressions = compare(baseline, results, args.alpha,
+                                  args.threshold)
+            sys.exit(1 if regressions else 0)
+        sys.exit()
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark '{name}'")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name}")
+        BENCHMARKS[name]()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+
+import pygame
+
+from asset_manager import ATLAS_MANIFEST, atlas_key
+from settings import Settings
+
+
+def atlas_images(settings):
+    """Return every image the game uses at the size it is drawn at
+
+    Args:
+        settings (Settings): Settings the sizes are taken from
+
+    Returns:
+        list: (path, (width, height)) pairs
+    """
+    ship_size = (int(settings.ship_scale_width),
+                 int(settings.ship_scale_height))
+    alien_size = (int(settings.alien_scale_width),
+                  int(settings.alien_scale_height))
+    images = [('images/ship.png', ship_size),
+              ('images/alien.png', alien_size)]
+
+    # The default star and every size the starfield scales stars to
+    star_sizes = [(int(settings.star_scale_width),
+                   int(settings.star_scale_height))]
+    star_sizes += [(width, width)
+                   for width in range(1, int(settings.star_scale_width) + 1)
+                   if (width, width) != star_sizes[0]]
+    images += [('images/star.png', size) for size in star_sizes]
+    return images
+
+
+def pack(sizes, max_width=1024, padding=1):
+    """Place rectangles on shelves, tallest first
+
+    Args:
+        sizes (list): (width, height) of every rectangle
+        max_width (int, optional): Width of the atlas
+        padding (int, optional): Empty pixels between rectangles
+
+    Returns:
+        tuple: A list with the (x, y) position of every rectangle and the
+            (width, height) of the atlas
+    """
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1],
+                   reverse=True)
+    positions = [None] * len(sizes)
+    x = y = shelf_height = used_width = 0
+    for index in order:
+        width, height = sizes[index]
+        if x and x + width > max_width:
+            # Start a new shelf below the current one
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[index] = (x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+        used_width = max(used_width, x - padding)
+    return positions, (max(used_width, 1), max(y + shelf_height, 1))
+
+
+def build_atlas(manifest_path=ATLAS_MANIFEST, settings=None):
+    """Scale all game images to their in-game size and pack them into one
+    image with a manifest of their places
+
+    Images whose source file is missing are left out, the game then
+    falls back to loading them itself.
+
+    Args:
+        manifest_path (str, optional): Manifest to write, the atlas image
+            is written next to it
+        settings (Settings, optional): Settings the sizes are taken from
+
+    Returns:
+        dict: The manifest
+    """
+    if settings is None:
+        settings = Settings()
+
+    # Scale exactly like the game does, from the converted source image
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+    sources = {}
+    images = []
+    for path, size in atlas_images(settings):
+        if path not in sources:
+            if not os.path.exists(path):
+                print(f"Skipping missing {path}")
+                sources[path] = None
+                continue
+            sources[path] = pygame.image.load(path).convert_alpha()
+        if sources[path] is not None:
+            images.append((path, size,
+                           pygame.transform.scale(sources[path], size)))
+
+    positions, atlas_size = pack([size for _, size, _ in images])
+    atlas = pygame.Surface(atlas_size, pygame.SRCALPHA)
+    regions = {}
+    for (path, size, image), position in zip(images, positions):
+        # Copy the pixels as they are, blending would darken the edges
+        atlas.blit(image, position, None, pygame.BLEND_RGBA_MAX)
+        regions[atlas_key(path, size)] = [*position, *size]
+
+    image_name = os.path.splitext(os.path.basename(manifest_path))[0] + '.png'
+    pygame.image.save(atlas, os.path.join(os.path.dirname(manifest_path),
+                                          image_name))
+    manifest = {'image': image_name, 'size': list(atlas_size),
+                'regions': regions}
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Pack the game images into a texture atlas')
+    parser.add_argument('--manifest', default=ATLAS_MANIFEST,
+                        help=f"manifest to write, default {ATLAS_MANIFEST}")
+    args = parser.parse_args()
+
+    manifest = build_atlas(args.manifest)
+    width, height = manifest['size']
+    print(f"Packed {len(manifest['regions'])} images into a "
+          f"{width}x{height} atlas")
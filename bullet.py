@@ -1,22 +1,30 @@
+from array import array
+
 import pygame
 from pygame.sprite import Sprite
 
+from surfaces import counted
+
 class Bullet(Sprite):
     """A class tor create bullets fired from the ship
 
     Args:
         Sprite (_Sprite_): Parent-class sprite
-    """    
-    def __init__(self, ai_game):
+    """
+    def __init__(self, ai_game, pool=None, slot=None):
         """Create a bullet object at the ships current position
 
         Args:
-            ai_game (AilenInvasion): Running Ailen_invasion 
-        """        
+            ai_game (AilenInvasion): Running Ailen_invasion
+            pool (BulletPool, optional): Pool the bullet is recycled by
+            slot (int, optional): Index of the bullet in the pool arrays
+        """
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
         self.color = self.settings.bullet_color
+        self.pool = pool
+        self.slot = slot
 
         # Create a bullet rect at (0, 0) and then set correct position
         self.rect = pygame.Rect(0, 0, self.settings.bullet_width,
@@ -24,16 +32,217 @@ class Bullet(Sprite):
         self.rect.midtop = ai_game.ship.rect.midtop
 
         self.y = float(self.rect.y)
-    
+
+    @property
+    def y(self):
+        """Exact vertical position of the bullet
+        """
+        if self.pool is None:
+            return self._y
+        return self.pool.ys[self.slot]
+
+    @y.setter
+    def y(self, value):
+        if self.pool is None:
+            self._y = value
+        else:
+            self.pool.ys[self.slot] = value
+
     def update(self) -> None:
-        """Move the bullet up the screen 
-        """ 
+        """Move the bullet up the screen
+        """
         # Update the bullets y position
         self.y -= self.settings.bullet_speed
-        # set rect position accordingly 
-        self.rect.y = self.y       
+        # set rect position accordingly
+        self.rect.y = self.y
+
+    def kill(self):
+        """Remove the bullet from all groups and return it to its pool
+        """
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+    def draw_bullet(self, offset_y=0) -> pygame.Rect:
+        """Draw the bullet to the screen and return the drawn rect
+
+        Args:
+            offset_y (int, optional): Vertical shift from the bullet's
+                position
+        """
+        rect = self.rect
+        if offset_y:
+            rect = rect.move(0, offset_y)
+        return pygame.draw.rect(self.screen, self.color, rect)
+
+
+class BulletPool:
+    """A class to recycle a fixed set of bullets instead of creating new ones
+
+    Positions and speeds of all bullets live in preallocated arrays. Dead
+    bullets go back to a free list and are reused by the next shot, so
+    firing and culling allocate nothing.
+    """
+
+    def __init__(self, ai_game):
+        """Create the pool with room for the allowed number of bullets
+
+        Args:
+            ai_game (AlienInvasion): Running instance of Alien Invasion
+        """
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.bullets = ai_game.bullets
+
+        self.ys = array('d')
+        # Positions before the last update, used to draw in between updates
+        self.prev_ys = array('d')
+        self.speeds = array('d')
+        self.free = []
+        # Bullets in flight, each knows its index in this list
+        self.active = []
+        # Pre-rendered bullet images, keyed by color
+        self.images = {}
+        self._grow(self.settings.bullets_allowed)
+
+    def _grow(self, capacity):
+        """Add bullets to the pool until it holds capacity bullets
+
+        Args:
+            capacity (int): New size of the pool
+        """
+        for slot in range(len(self.ys), capacity):
+            self.ys.append(0.0)
+            self.prev_ys.append(0.0)
+            self.speeds.append(0.0)
+            self.free.append(Bullet(self.ai_game, self, slot))
+
+    def fire(self, position=None):
+        """Launch a bullet from the ship if the limit allows it
+
+        Args:
+            position (tuple, optional): (x, y) top left position to place
+                the bullet at instead of the ship's nose
+
+        Returns:
+            Bullet: The launched bullet or None
+        """
+        if len(self.active) >= self.settings.bullets_allowed:
+            return None
+        if not self.free:
+            self._grow(max(self.settings.bullets_allowed,
+                           2 * len(self.ys)))
+
+        bullet = self.free.pop()
+        if position is None:
+            bullet.rect.midtop = self.ai_game.ship.rect.midtop
+            self.ys[bullet.slot] = bullet.rect.y
+        else:
+            bullet.rect.topleft = position
+            self.ys[bullet.slot] = position[1]
+        self.prev_ys[bullet.slot] = self.ys[bullet.slot]
+        self.speeds[bullet.slot] = self.settings.bullet_speed
+        bullet.color = self.settings.bullet_color
+
+        bullet.active_index = len(self.active)
+        self.active.append(bullet)
+        self.bullets.add(bullet)
+        return bullet
+
+    def release(self, bullet):
+        """Take a dead bullet out of flight and make it reusable
+
+        Args:
+            bullet (Bullet): Bullet that was killed
+        """
+        index = getattr(bullet, 'active_index', None)
+        if index is None:
+            return
+        # Move the last bullet into the gap
+        last = self.active.pop()
+        if last is not bullet:
+            self.active[index] = last
+            last.active_index = index
+        bullet.active_index = None
+        self.free.append(bullet)
+
+    def update(self, dt=None):
+        """Move all bullets up and recycle the ones that left the screen
+
+        Args:
+            dt (float, optional): Time step in seconds, one update at the
+                speed reference rate by default
+        """
+        scale = 1.0
+        if dt is not None:
+            scale = dt * self.settings.speed_reference_rate
+
+        ys, speeds, active = self.ys, self.speeds, self.active
+        # Walk backwards, released bullets are replaced by already
+        # updated ones from the end
+        for index in range(len(active) - 1, -1, -1):
+            bullet = active[index]
+            slot = bullet.slot
+            ys[slot] -= speeds[slot] * scale
+            bullet.rect.y = ys[slot]
+            if bullet.rect.bottom < 0:
+                bullet.kill()
+
+    def store_previous(self):
+        """Remember the bullet positions before the next update
+        """
+        self.prev_ys[:] = self.ys
+
+    def image(self, color):
+        """Return the pre-rendered image of a bullet
+
+        Args:
+            color (tuple): Color of the bullet
+        """
+        image = self.images.get(color)
+        if image is None:
+            image = counted(pygame.Surface((self.settings.bullet_width,
+                                            self.settings.bullet_height)))
+            if pygame.display.get_surface() is not None:
+                image = counted(image.convert())
+            image.fill(color)
+            self.images[color] = image
+        return image
+
+    def draw(self, alpha=1.0):
+        """Draw all bullets in flight with a single batched blit
+
+        Args:
+            alpha (float, optional): Position between the previous (0) and
+                the current (1) update to draw the bullets at
+
+        Returns:
+            list: Rects drawn to
+        """
+        active = self.active
+        if not active:
+            return []
+
+        # Bullets keep the color they were fired with, usually all the same
+        color = active[0].color
+        image = self.image(color)
+        if alpha == 1.0:
+            blits = [(image, bullet.rect) for bullet in active]
+        else:
+            back = 1.0 - alpha
+            ys, prev_ys = self.ys, self.prev_ys
+            blits = [(image, bullet.rect.move(
+                        0, round((prev_ys[bullet.slot] - ys[bullet.slot])
+                                 * back)))
+                     for bullet in active]
+
+        for index, bullet in enumerate(active):
+            if bullet.color != color:
+                blits[index] = (self.image(bullet.color), blits[index][1])
+        return self.ai_game.screen.blits(blits)
 
-    def draw_bullet(self) -> None:
-        """Draw the bullet to the screen 
+    def clear(self):
+        """Recycle all bullets in flight
         """
-        pygame.draw.rect(self.screen, self.color, self.rect)        
\ No newline at end of file
+        for bullet in self.active[::-1]:
+            bullet.kill()
@@ -1,4 +1,7 @@
-import pygame.font
+import pygame
+
+from fonts import get_font
+from surfaces import counted
 
 
 class Button:
@@ -19,7 +22,7 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = (0, 135, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = get_font(None, 48)
 
         # Build the Button's rect object and center it
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -35,14 +38,18 @@ class Button:
         Args:
             msg (str): Message to print to the button
         """        
-        self.msg_image = self.font.render(msg, True, self.text_color, 
-                                          self.button_color)
+        self.msg_image = counted(self.font.render(msg, True, self.text_color,
+                                                  self.button_color))
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
     
     def draw_button(self):
         """Draw blank button and then draw message
+
+        Returns:
+            list: Rects drawn to
         """        
         self.screen.fill(self.button_color, self.rect)
         self.screen.blit(self.msg_image, self.msg_image_rect)
+        return [self.rect.copy()]
@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+from array import array
+
+from alien_invasion import AlienInvasion
+
+
+# Actions an agent can take each step
+NOOP, LEFT, RIGHT, FIRE, LEFT_FIRE, RIGHT_FIRE = range(6)
+ACTIONS = (NOOP, LEFT, RIGHT, FIRE, LEFT_FIRE, RIGHT_FIRE)
+
+
+class AlienInvasionEnv:
+    """A class to play a single headless game step by step, gym style
+
+    Observations are flat array('f') buffers, numpy.asarray() can wrap
+    them without copying. The layout is the ship, the game progress, the
+    fleet offset and direction, the bullets in flight and one alive flag
+    per alien in the formation. Positions are scaled to the screen size.
+    """
+
+    def __init__(self, seed=None, frame_skip=4, settings=None):
+        """Create the game
+
+        Args:
+            seed (int, optional): Seed for the first episode
+            frame_skip (int, optional): Game updates per step, the action
+                is held for all of them
+            settings (Settings, optional): Settings to play with instead
+                of the defaults
+        """
+        self.frame_skip = frame_skip
+        self.game = AlienInvasion(headless=True, seed=seed,
+                                  settings=settings)
+        self.settings = self.game.settings
+        self.max_bullets = self.settings.bullets_allowed
+        self.last_score = 0
+
+    def reset(self):
+        """Start a new episode
+
+        Returns:
+            array: The first observation
+        """
+        self.game._start_new_game()
+        self.last_score = 0
+        return self.observe()
+
+    def step(self, action):
+        """Apply an action and advance the game by frame_skip updates
+
+        Args:
+            action (int): One of ACTIONS
+
+        Returns:
+            tuple: (observation, reward, done, info)
+        """
+        ship = self.game.ship
+        ship.moving_left = action in (LEFT, LEFT_FIRE)
+        ship.moving_right = action in (RIGHT, RIGHT_FIRE)
+        if action in (FIRE, LEFT_FIRE, RIGHT_FIRE):
+            self.game._fire_bullet()
+
+        self.game.step(self.frame_skip)
+
+        stats = self.game.stats
+        reward = stats.score - self.last_score
+        self.last_score = stats.score
+        done = not self.game.state.active
+        info = {'level': stats.level, 'ships_left': stats.ships_left,
+                'score': stats.score}
+        return self.observe(), reward, done, info
+
+    @property
+    def observation_size(self) -> int:
+        """Number of values in an observation
+        """
+        return 7 + 2 * self.max_bullets + len(self.game.fleet)
+
+    def observe(self):
+        """Return the observation of the current game state
+        """
+        game = self.game
+        width = self.settings.screen_width
+        height = self.settings.screen_height
+        fleet = game.fleet
+
+        obs = array('f', (
+            game.ship.x / width,
+            game.stats.ships_left,
+            game.stats.level,
+            1.0 if game.state.playing else 0.0,
+            fleet.offset_x / width,
+            fleet.offset_y / height,
+            self.settings.fleet_direction,
+        ))
+
+        # Bullets in a fixed number of slots, empty slots are -1
+        bullets = game.bullet_pool.active[:self.max_bullets]
+        for bullet in bullets:
+            obs.append(bullet.rect.x / width)
+            obs.append(bullet.rect.y / height)
+        obs.extend([-1.0] * (2 * (self.max_bullets - len(bullets))))
+
+        obs.extend(map(float, fleet.alive))
+        return obs
+
+
+def _run_worker(conn, seeds, frame_skip):
+    """Step a group of environments on behalf of a VectorEnv
+
+    Args:
+        conn (Connection): Pipe to the VectorEnv
+        seeds (list): One seed per environment
+        frame_skip (int): Game updates per step
+    """
+    envs = [AlienInvasionEnv(seed, frame_skip) for seed in seeds]
+    try:
+        while True:
+            command, data = conn.recv()
+            if command == 'reset':
+                conn.send([env.reset() for env in envs])
+            elif command == 'step':
+                conn.send([_step_and_reset(env, action)
+                           for env, action in zip(envs, data)])
+            elif command == 'close':
+                break
+    finally:
+        conn.close()
+
+
+def _step_and_reset(env, action):
+    """Step an environment and start a new episode when it is done
+
+    Args:
+        env (AlienInvasionEnv): Environment to step
+        action (int): Action to apply
+    """
+    obs, reward, done, info = env.step(action)
+    if done:
+        info['final_observation'] = obs
+        obs = env.reset()
+    return obs, reward, done, info
+
+
+class VectorEnv:
+    """A class to step many independent games in lockstep
+
+    Finished games start a new episode right away, their last observation
+    is passed in info['final_observation']. The 'process' backend spreads
+    the games over one worker process per core.
+    """
+
+    def __init__(self, num_envs, seed=0, frame_skip=4, backend='serial',
+                 workers=None):
+        """Create the games
+
+        Args:
+            num_envs (int): Number of games
+            seed (int, optional): Seed of the first game, the others count
+                up from it
+            frame_skip (int, optional): Game updates per step
+            backend (str, optional): 'serial' to run all games in this
+                process or 'process' to use worker processes
+            workers (int, optional): Number of worker processes, the
+                number of cores by default
+        """
+        self.num_envs = num_envs
+        self.backend = backend
+        seeds = [seed + i for i in range(num_envs)]
+
+        if backend == 'serial':
+            self.envs = [AlienInvasionEnv(s, frame_skip) for s in seeds]
+        elif backend == 'process':
+            workers = min(workers or os.cpu_count() or 1, num_envs)
+            # Each worker gets a contiguous share of the games
+            bounds = [num_envs * i // workers for i in range(workers + 1)]
+            context = multiprocessing.get_context('spawn')
+            self.conns = []
+            self.processes = []
+            self.shares = []
+            for start, stop in zip(bounds, bounds[1:]):
+                parent, child = context.Pipe()
+                process = context.Process(
+                    target=_run_worker,
+                    args=(child, seeds[start:stop], frame_skip), daemon=True)
+                process.start()
+                child.close()
+                self.conns.append(parent)
+                self.processes.append(process)
+                self.shares.append((start, stop))
+        else:
+            raise ValueError(f"unknown backend '{backend}'")
+
+    def reset(self):
+        """Start a new episode in every game
+
+        Returns:
+            list: One observation per game
+        """
+        if self.backend == 'serial':
+            return [env.reset() for env in self.envs]
+
+        for conn in self.conns:
+            conn.send(('reset', None))
+        return [obs for conn in self.conns for obs in conn.recv()]
+
+    def step(self, actions):
+        """Apply one action per game and advance all games
+
+        Args:
+            actions (sequence): One action per game
+
+        Returns:
+            tuple: Lists of observations, rewards, done flags and infos
+        """
+        if self.backend == 'serial':
+            results = [_step_and_reset(env, action)
+                       for env, action in zip(self.envs, actions)]
+        else:
+            for conn, (start, stop) in zip(self.conns, self.shares):
+                conn.send(('step', list(actions[start:stop])))
+            results = [result for conn in self.conns
+                       for result in conn.recv()]
+
+        obs, rewards, dones, infos = zip(*results)
+        return list(obs), list(rewards), list(dones), list(infos)
+
+    def close(self):
+        """Stop the worker processes
+        """
+        if self.backend != 'process':
+            return
+        for conn in self.conns:
+            conn.send(('close', None))
+            conn.close()
+        for process in self.processes:
+            process.join()
+        self.conns = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,339 @@
+import math
+from array import array
+
+
+def _row_mask(pattern, row, rows, columns):
+    """Return which places of a formation row hold an alien
+
+    Args:
+        pattern (str): 'grid', 'checker', 'wedge' or 'diamond'
+        row (int): Index of the row
+        rows (int): Number of rows in the formation
+        columns (int): Number of columns in the formation
+
+    Returns:
+        list: 1 for every place with an alien, 0 for empty places
+    """
+    if pattern == 'grid':
+        return [1] * columns
+    if pattern == 'checker':
+        return [(row + col + 1) % 2 for col in range(columns)]
+
+    center = (columns - 1) / 2
+    if pattern == 'wedge':
+        # Point at the top, widening towards the bottom row
+        half = (row + 1) / rows * (center + 0.5)
+        return [int(abs(col - center) < half) for col in range(columns)]
+    if pattern == 'diamond':
+        middle = (rows - 1) / 2
+        height = 1 - abs(row - middle) / (middle + 0.5)
+        return [int(abs(col - center) < height * (center + 0.5))
+                for col in range(columns)]
+    raise ValueError(f"unknown fleet pattern '{pattern}'")
+
+
+def _round(x):
+    """Round a position half away from zero, like pygame.Rect does
+
+    Args:
+        x (float): Position to round
+    """
+    return int(x + 0.5) if x >= 0 else -int(0.5 - x)
+
+
+class Fleet:
+    """A class to keep the state of the whole alien fleet in flat arrays
+
+    All aliens move together, so each alien only stores its position in
+    the formation. The fleet keeps one shared offset, which makes moving,
+    edge detection, dropping and the bottom check a single operation per
+    frame. Drawing and collisions read positions from the arrays and
+    only look at the formation cells involved. Alien sprites just hold
+    the image and which aliens are alive, they are not moved every update.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize an empty fleet
+
+        Args:
+            ai_game (AlienInvasion): Running instance of Alien Invasion
+        """
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+        self.profiler = ai_game.profiler
+        self.build()
+
+    def build(self):
+        """Lay out a new fleet filling the screen
+
+        Spacing between aliens is one alien width, rows are one alien
+        height apart. The fleet_size and fleet_pattern settings choose
+        how many places the formation has and which of them hold an alien.
+        """
+        self.alien_width = int(self.settings.alien_scale_width)
+        self.alien_height = int(self.settings.alien_scale_height)
+
+        self.base_x = array('d')
+        self.base_y = array('q')
+        self.alive = array('b')
+        # Alien sprites showing the living aliens, keyed by fleet index
+        self.views = {}
+        # Every alien sprite made for this formation, dead ones included,
+        # so restoring a world state can show them again
+        self.sprites = {}
+
+        # Column and row pitch of the regular formation
+        self.pitch_x = 2 * self.alien_width
+        self.pitch_y = 2 * self.alien_height
+
+        xs = range(self.alien_width,
+                   self.settings.screen_width - 2 * self.alien_width,
+                   self.pitch_x)
+        ys = range(self.alien_height,
+                   self.settings.screen_height - 3 * self.alien_height,
+                   self.pitch_y)
+        self.columns = len(xs)
+        if self.settings.fleet_size is not None:
+            # A given number of aliens may continue below the screen
+            rows = math.ceil(self.settings.fleet_size / self.columns)
+            ys = range(ys.start, ys.start + rows * self.pitch_y,
+                       self.pitch_y)
+        self.rows = len(ys)
+
+        for row, y in enumerate(ys):
+            self.base_x.extend(xs)
+            self.base_y.extend([y] * self.columns)
+            self.alive.extend(_row_mask(self.settings.fleet_pattern, row,
+                                        self.rows, self.columns))
+        if self.settings.fleet_size is not None:
+            # The last row may be only partly filled
+            del self.alive[self.settings.fleet_size:]
+            del self.base_x[self.settings.fleet_size:]
+            del self.base_y[self.settings.fleet_size:]
+
+        self.alive_count = self.alive.count(1)
+        self.offset_x = 0.0
+        self.offset_y = 0
+        self.store_previous()
+        self._update_extents()
+
+    def __len__(self):
+        return len(self.alive)
+
+    def position(self, index):
+        """Return the current screen position of an alien
+
+        Args:
+            index (int): Index of the alien in the fleet
+        """
+        return (_round(self.base_x[index] + self.offset_x),
+                self.base_y[index] + self.offset_y)
+
+    def kill(self, index):
+        """Mark an alien as destroyed
+
+        Args:
+            index (int): Index of the alien in the fleet
+        """
+        if self.alive[index]:
+            self.alive[index] = 0
+            self.alive_count -= 1
+            self._extents_dirty = True
+            self.views.pop(index, None)
+
+    def _update_extents(self):
+        """Recompute the bounding box of the remaining aliens in formation
+        coordinates
+        """
+        alive_x = [x for x, a in zip(self.base_x, self.alive) if a]
+        alive_y = [y for y, a in zip(self.base_y, self.alive) if a]
+        if alive_x:
+            self.min_x, self.max_x = min(alive_x), max(alive_x)
+            self.max_y = max(alive_y)
+        else:
+            self.min_x = self.max_x = self.max_y = 0
+        self._extents_dirty = False
+
+    def check_edges(self) -> bool:
+        """Return True if the fleet touches the left or right screen edge
+        """
+        if not self.alive_count:
+            return False
+        if self._extents_dirty:
+            self._update_extents()
+        left = _round(self.min_x + self.offset_x)
+        right = _round(self.max_x + self.offset_x) + self.alien_width
+        return right >= self.screen_rect.right or left <= 0
+
+    def drop(self):
+        """Drop the entire fleet by the fleet drop speed
+        """
+        self.offset_y += self.settings.fleet_drop_speed
+
+    def move(self, dt=None):
+        """Move the entire fleet sideways in the current direction
+
+        Args:
+            dt (float, optional): Time step in seconds, one update at the
+                speed reference rate by default
+        """
+        speed = self.settings.alien_speed
+        if dt is not None:
+            speed *= dt * self.settings.speed_reference_rate
+        self.offset_x += speed * self.settings.fleet_direction
+
+    def store_previous(self):
+        """Remember the fleet position before the next update
+        """
+        self.prev_offset_x = self.offset_x
+        self.prev_offset_y = self.offset_y
+
+    def render_shift(self, alpha):
+        """Return how far to shift the aliens to draw them in between
+        the previous and the current update
+
+        Args:
+            alpha (float): 0 for the previous, 1 for the current update
+        """
+        if alpha == 1.0:
+            return 0, 0
+        back = 1.0 - alpha
+        return (round((self.prev_offset_x - self.offset_x) * back),
+                round((self.prev_offset_y - self.offset_y) * back))
+
+    def draw(self, surface, alpha=1.0):
+        """Draw all living aliens with a single batched blit
+
+        Positions are taken from the fleet arrays, the alien sprites are
+        not moved for it.
+
+        Args:
+            surface (pygame.Surface): Surface to draw to
+            alpha (float, optional): Position between the previous (0) and
+                the current (1) update to draw the aliens at
+
+        Returns:
+            list: Rects drawn to
+        """
+        shift_x, shift_y = self.render_shift(alpha)
+        offset_x, offset_y = self.offset_x, self.offset_y + shift_y
+        base_x, base_y = self.base_x, self.base_y
+        blits = [(alien.image,
+                  (_round(base_x[index] + offset_x) + shift_x,
+                   base_y[index] + offset_y))
+                 for index, alien in self.views.items()]
+        return surface.blits(blits)
+
+    def reached_bottom(self) -> bool:
+        """Return True if any alien has reached the bottom of the screen
+        """
+        if not self.alive_count:
+            return False
+        if self._extents_dirty:
+            self._update_extents()
+        bottom = self.max_y + self.offset_y + self.alien_height
+        return bottom >= self.settings.screen_height
+
+    def sync_views(self):
+        """Move the alien sprites to their current fleet positions
+
+        The game itself never reads the sprite rects, call this before
+        looking at them.
+        """
+        offset_x, offset_y = self.offset_x, self.offset_y
+        base_x, base_y = self.base_x, self.base_y
+        for index, alien in self.views.items():
+            alien.x = base_x[index] + offset_x
+            alien.rect.x = alien.x
+            alien.rect.y = base_y[index] + offset_y
+
+    def _alien_rect(self, index):
+        """Return the screen rect of an alien as (x, y, width, height)
+
+        Args:
+            index (int): Index of the alien in the fleet
+        """
+        return (_round(self.base_x[index] + self.offset_x),
+                self.base_y[index] + self.offset_y,
+                self.alien_width, self.alien_height)
+
+    def _cells(self, rect):
+        """Return the indices of the formation cells a rect may overlap
+
+        Args:
+            rect (pygame.Rect): Rect to look up
+        """
+        # Screen position of the top left cell of the formation
+        origin_x = self.alien_width + self.offset_x
+        origin_y = self.alien_height + self.offset_y
+        # Widen the cell range by one to cover rounding of positions
+        first_col = max(int((rect.left - origin_x - self.alien_width)
+                            // self.pitch_x), 0)
+        last_col = min(int((rect.right - origin_x) // self.pitch_x) + 1,
+                       self.columns - 1)
+        first_row = max(int((rect.top - origin_y - self.alien_height)
+                            // self.pitch_y), 0)
+        last_row = min(int((rect.bottom - origin_y) // self.pitch_y) + 1,
+                       self.rows - 1)
+        return [row * self.columns + col
+                for row in range(first_row, last_row + 1)
+                for col in range(first_col, last_col + 1)]
+
+    def collide_rect(self, rect) -> bool:
+        """Return True if a rect overlaps any living alien
+
+        Only the aliens in the formation cells the rect overlaps are
+        tested.
+
+        Args:
+            rect (pygame.Rect): Rect to test, like the ship's
+        """
+        if not self.alive_count:
+            return False
+        views = self.views
+        for index in self._cells(rect):
+            if index in views and rect.colliderect(self._alien_rect(index)):
+                return True
+        return False
+
+    def collide_bullets(self, bullets, dokill_bullets, dokill_aliens):
+        """Find bullets hitting aliens of the fleet
+
+        Works like pygame.sprite.groupcollide, but only tests each bullet
+        against the aliens in the formation cells it overlaps instead of
+        against every alien.
+
+        Args:
+            bullets (Group): Bullets to test
+            dokill_bullets (bool): Remove bullets that hit an alien
+            dokill_aliens (bool): Remove aliens that are hit
+
+        Returns:
+            dict: Every bullet that hit mapped to the list of aliens it hit
+        """
+        collisions = {}
+        if not self.alive_count:
+            return collisions
+
+        views = self.views
+        tested = 0
+        for bullet in bullets.sprites():
+            rect = bullet.rect
+            hit = []
+            for index in self._cells(rect):
+                alien = views.get(index)
+                if alien is not None:
+                    tested += 1
+                    if rect.colliderect(self._alien_rect(index)):
+                        hit.append(alien)
+
+            if hit:
+                if dokill_aliens:
+                    for alien in hit:
+                        alien.kill()
+                if dokill_bullets:
+                    bullet.kill()
+                collisions[bullet] = hit
+
+        self.profiler.count('collisions_tested', tested)
+        return collisions
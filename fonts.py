@@ -0,0 +1,24 @@
+import pygame.font
+
+
+# Fonts loaded so far, keyed by (name, size)
+_fonts = {}
+
+
+def get_font(name=None, size=48):
+    """Return a system font, loading every font only once per process
+
+    Args:
+        name (str, optional): Font name, pygame's default font if None
+        size (int, optional): Font size in pixels
+
+    Returns:
+        pygame.font.Font: The shared font
+    """
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
@@ -0,0 +1,72 @@
+class GameState:
+    """A class for the state the game is in and how long it stays there
+
+    Timed states like respawning count down with the simulation's frame
+    time and switch back to playing when they run out, so the main loop
+    never has to block.
+    """
+
+    GAME_OVER = 'game over'
+    PLAYING = 'playing'
+    RESPAWNING = 'respawning'
+    LEVEL_TRANSITION = 'level transition'
+    PAUSED = 'paused'
+
+    def __init__(self):
+        """Start on the game over screen, which shows the Play button
+        """
+        self.state = self.GAME_OVER
+        # Milliseconds left in a timed state
+        self.timer = 0.0
+        # State to return to when leaving the pause
+        self.resume_state = None
+
+    def set(self, state, duration_ms=0.0):
+        """Switch to a new state
+
+        Args:
+            state (str): One of the state constants
+            duration_ms (float, optional): Time to stay in a timed state
+        """
+        self.state = state
+        self.timer = duration_ms
+        self.resume_state = None
+
+    def toggle_pause(self):
+        """Pause a running game or resume a paused one
+        """
+        if self.state == self.PAUSED:
+            self.state = self.resume_state
+            self.resume_state = None
+        elif self.state != self.GAME_OVER:
+            self.resume_state = self.state
+            self.state = self.PAUSED
+
+    def update(self, dt_ms):
+        """Let time pass in timed states
+
+        Args:
+            dt_ms (float): Frame time in milliseconds
+        """
+        if self.state in (self.RESPAWNING, self.LEVEL_TRANSITION):
+            self.timer -= dt_ms
+            if self.timer <= 0:
+                self.set(self.PLAYING)
+
+    @property
+    def active(self) -> bool:
+        """True while a game is running, paused or not
+        """
+        return self.state != self.GAME_OVER
+
+    @property
+    def paused(self) -> bool:
+        """True while the game is paused
+        """
+        return self.state == self.PAUSED
+
+    @property
+    def playing(self) -> bool:
+        """True while the game is simulated
+        """
+        return self.state == self.PLAYING
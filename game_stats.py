@@ -1,5 +1,4 @@
-import json
-import os
+from persistence import load_high_score, save_dir
 
 class GameStats:
     """Track statistics for alien invasion
@@ -27,12 +26,4 @@ class GameStats:
     def prep_high_score(self):
         """Loads the high score from previous games
         """ 
-        high_score_save = 'high_score.json'
-
-        if os.path.exists(high_score_save):
-            with open(high_score_save, "r") as json_datei:
-                data = json.load(json_datei)
-            
-            self.high_score = data
-        else:
-            self.high_score = 0
\ No newline at end of file
+        self.high_score = load_high_score(save_dir(self.settings))
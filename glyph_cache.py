@@ -0,0 +1,149 @@
+import pygame
+
+from surfaces import counted
+
+
+# Glyph caches shared by all texts, keyed by (font, color)
+_glyph_caches = {}
+
+# Maps every digit to '0', texts with the same layout become equal
+_LAYOUT = str.maketrans('0123456789', '0000000000')
+
+
+def get_glyph_cache(font, color):
+    """Return the shared glyph cache for a font and text color
+
+    Args:
+        font (pygame.font.Font): Font to render with
+        color (tuple): Text color
+    """
+    key = (font, tuple(color))
+    cache = _glyph_caches.get(key)
+    if cache is None:
+        cache = _glyph_caches[key] = GlyphCache(font, color)
+    return cache
+
+
+class GlyphCache:
+    """A class to keep every character of a font rendered only once
+
+    Digits all get the width of the widest digit, so numbers of the same
+    length always line up and single digits can be replaced in place.
+    """
+
+    def __init__(self, font, color):
+        """Initialize an empty cache
+
+        Args:
+            font (pygame.font.Font): Font to render with
+            color (tuple): Text color
+        """
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        self.blanks = {}
+        self.height = font.get_height()
+        self.digit_width = max(font.size(digit)[0] for digit in '0123456789')
+
+    def glyph(self, char):
+        """Return the rendered surface for a character
+
+        Args:
+            char (str): A single character
+        """
+        image = self.glyphs.get(char)
+        if image is None:
+            image = self.glyphs[char] = counted(self.font.render(
+                char, True, self.color, None))
+        return image
+
+    def blank(self, width):
+        """Return a transparent surface to erase a cell of the given width
+
+        Args:
+            width (int): Width of the cell
+        """
+        image = self.blanks.get(width)
+        if image is None:
+            image = self.blanks[width] = counted(pygame.Surface(
+                (width, self.height), pygame.SRCALPHA))
+        return image
+
+    def cell_width(self, char) -> int:
+        """Return the horizontal space a character takes up
+
+        Args:
+            char (str): A single character
+        """
+        if char.isdigit():
+            return self.digit_width
+        return self.glyph(char).get_width()
+
+
+class CachedText:
+    """A class for a line of text composed from cached glyphs
+
+    When the new text has the same layout as the old one, only the
+    changed characters are redrawn, everything else stays on the image.
+    """
+
+    def __init__(self, font, color):
+        """Initialize the text without content
+
+        Args:
+            font (pygame.font.Font): Font to render with
+            color (tuple): Text color
+        """
+        self.cache = get_glyph_cache(font, color)
+        self.text = None
+        self.image = None
+        self.cells = []
+
+    def set_text(self, text):
+        """Change the text and return the updated image
+
+        Args:
+            text (str): New text
+
+        Returns:
+            pygame.Surface: The image of the text
+        """
+        if text == self.text:
+            return self.image
+
+        cache = self.cache
+        old = self.text
+        if old is not None and (old.translate(_LAYOUT)
+                                == text.translate(_LAYOUT)):
+            # Same layout, replace the characters that changed
+            for char, old_char, (x, width) in zip(text, old, self.cells):
+                if char != old_char:
+                    # Blending with a transparent cell clears it, this is
+                    # much cheaper than fill() on an alpha surface
+                    self.image.blit(cache.blank(width), (x, 0), None,
+                                    pygame.BLEND_RGBA_MIN)
+                    self._blit_glyph(char, x, width)
+        else:
+            widths = [cache.cell_width(char) for char in text]
+            self.image = counted(pygame.Surface(
+                (max(sum(widths), 1), cache.height), pygame.SRCALPHA))
+            self.cells = []
+            x = 0
+            for char, width in zip(text, widths):
+                self._blit_glyph(char, x, width)
+                self.cells.append((x, width))
+                x += width
+
+        self.text = text
+        return self.image
+
+    def _blit_glyph(self, char, x, width):
+        """Draw a character centered in its cell
+
+        Args:
+            char (str): Character to draw
+            x (int): Left edge of the cell
+            width (int): Width of the cell
+        """
+        glyph = self.cache.glyph(char)
+        self.image.blit(glyph, (x + (width - glyph.get_width()) // 2, 0))
@@ -0,0 +1,150 @@
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+
+# The only event types the game handles, SDL drops all others
+HANDLED_EVENTS = [
+    pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+    pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP, pygame.JOYAXISMOTION,
+    pygame.JOYHATMOTION, pygame.JOYDEVICEADDED, pygame.JOYDEVICEREMOVED,
+]
+
+
+class InputHandler:
+    """A class to turn keyboard and gamepad input into game actions
+
+    Keys and gamepad buttons are looked up in the binding tables of the
+    settings. The left stick and the d-pad move the ship.
+
+    To measure latency, every input is timestamped when it is handled.
+    Its latency is the time until the first frame showing an update that
+    processed it is presented.
+    """
+
+    def __init__(self, ai_game, measure_latency=False):
+        """Build the binding tables
+
+        Args:
+            ai_game (AlienInvasion): Running instance of Alien Invasion
+            measure_latency (bool, optional): Timestamp inputs and record
+                their latency
+        """
+        self.settings = ai_game.settings
+        self.measure_latency = measure_latency
+        self.keys = {pygame.key.key_code(name): action
+                     for name, action in self.settings.key_bindings.items()}
+        self.buttons = dict(self.settings.gamepad_bindings)
+        self.joysticks = {}
+        # Direction the stick or d-pad points to, -1, 0 or 1
+        self.direction = 0
+
+        # Inputs waiting for an update and for a presented frame
+        self.pending = []
+        self.updated = []
+        # Latencies of the most recent inputs in seconds
+        self.latencies = deque(maxlen=1000)
+
+    def restrict_events(self):
+        """Only let the event types the game handles into the event queue
+        """
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(HANDLED_EVENTS)
+        pygame.joystick.init()
+
+    def actions(self, event):
+        """Return the actions an event triggers
+
+        Args:
+            event (pygame.event.Event): Event to translate
+
+        Returns:
+            list: (action, pressed) pairs, pressed is False on release
+        """
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            action = self.keys.get(event.key)
+            pressed = event.type == pygame.KEYDOWN
+        elif event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            action = self.buttons.get(event.button)
+            pressed = event.type == pygame.JOYBUTTONDOWN
+        elif event.type == pygame.JOYAXISMOTION:
+            if event.axis != 0:
+                return []
+            deadzone = self.settings.gamepad_deadzone
+            direction = ((event.value > deadzone)
+                         - (event.value < -deadzone))
+            return self._steer(direction)
+        elif event.type == pygame.JOYHATMOTION:
+            return self._steer(event.value[0])
+        elif event.type == pygame.JOYDEVICEADDED:
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.joysticks[joystick.get_instance_id()] = joystick
+            return []
+        elif event.type == pygame.JOYDEVICEREMOVED:
+            self.joysticks.pop(event.instance_id, None)
+            return []
+        else:
+            return []
+
+        if action is None:
+            return []
+        if self.measure_latency:
+            self.pending.append(perf_counter())
+        return [(action, pressed)]
+
+    def _steer(self, direction):
+        """Return the actions for a new stick or d-pad direction
+
+        Args:
+            direction (int): -1 for left, 1 for right, 0 for neither
+        """
+        if direction == self.direction:
+            return []
+        actions = []
+        if self.direction:
+            actions.append(('right' if self.direction > 0 else 'left', False))
+        if direction:
+            actions.append(('right' if direction > 0 else 'left', True))
+        self.direction = direction
+        if self.measure_latency:
+            self.pending.append(perf_counter())
+        return actions
+
+    def updated_game(self):
+        """Note that an update processed the pending inputs
+        """
+        if self.pending:
+            self.updated.extend(self.pending)
+            self.pending.clear()
+
+    def frame_presented(self):
+        """Note that a frame was shown, inputs it reflects get a latency
+        """
+        if self.updated:
+            now = perf_counter()
+            self.latencies.extend(now - t for t in self.updated)
+            self.updated.clear()
+
+    def percentiles(self, ps=(50, 90, 99)):
+        """Return percentiles of the input latency in milliseconds
+
+        Args:
+            ps (tuple, optional): Percentiles to compute
+
+        Returns:
+            dict: Percentile mapped to the latency in milliseconds
+        """
+        times = sorted(self.latencies)
+        if not times:
+            return {p: 0.0 for p in ps}
+        last = len(times) - 1
+        return {p: times[min(last, round(p / 100 * last))] * 1e3 for p in ps}
+
+    def report(self) -> str:
+        """Return the input latency percentiles as text
+        """
+        p = self.percentiles()
+        return (f"Input latency over {len(self.latencies)} inputs: "
+                f"{p[50]:.1f} / {p[90]:.1f} / {p[99]:.1f} ms "
+                f"(p50 / p90 / p99)")
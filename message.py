@@ -1,4 +1,7 @@
-import pygame.font
+import pygame
+
+from fonts import get_font
+from text_layout import render_paragraph
 
 class Message:
     """A class for printing long messages on the screen
@@ -20,41 +23,36 @@ class Message:
         self.width, self.height = 200, 50
         self.button_color = self.settings.bg_color
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = get_font(None, 48)
 
         # Build the messages rect object and center it
         self.rect = pygame.Rect(0, 0, self.width, self.height)
         self.rect.center = self.screen_rect.center
 
-        # The button message needs to be prepped only once
+        # The message is laid out again only when the screen size changes
         self._prep_msg(long_msg)
 
     def _prep_msg(self, long_msg):
-        """Turn long message into a rendered image on the screen center
+        """Wrap the long message to the screen width and render it into a
+        single image at the screen center
 
         Args:
             long_msg (str): Long message containing \n
         """        
-
-        lines = long_msg.split('\n')
-        self.rendered_lines = []
-        for line in lines:
-            rendered_line = self.font.render(line, True, self.text_color, 
-                                             self.button_color)
-            self.rendered_lines.append(rendered_line)
-
-        self.rendered_rects = [rendered_line.get_rect() for rendered_line 
-                          in self.rendered_lines]
+        self.long_msg = long_msg
+        self.screen_rect = self.screen.get_rect()
+        self.msg_image = render_paragraph(long_msg, self.font,
+                                          self.screen_rect.width,
+                                          self.text_color, self.button_color)
+        self.msg_image_rect = self.msg_image.get_rect()
+        self.msg_image_rect.center = self.screen_rect.center
         
     def draw_msg(self):
         """Draws the Message to the screen
-        """        
-
-        total_height = sum(rect.height for rect in self.rendered_rects)
-        start_y = self.rect.centery - total_height // 2
 
-        for i, (rendered_line, rendered_rect) in enumerate(
-                              zip(self.rendered_lines, self.rendered_rects)):
-            rendered_rect.midtop = (self.rect.centerx,
-                  start_y + sum(rect.height for rect in self.rendered_rects[:i]))
-            self.screen.blit(rendered_line, rendered_rect)
\ No newline at end of file
+        Returns:
+            list: Rects drawn to
+        """        
+        if self.screen.get_size() != self.screen_rect.size:
+            self._prep_msg(self.long_msg)
+        return [self.screen.blit(self.msg_image, self.msg_image_rect)]
@@ -0,0 +1,281 @@
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+
+
+# Directory of the game, saves don't depend on the working directory
+GAME_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HIGH_SCORE_FILE = 'high_score.json'
+SESSION_FILE = 'session.json'
+LEADERBOARD_FILE = 'leaderboard.jsonl'
+
+# Read once on import, os.umask() can only be read by setting it, which
+# is not safe on the writer thread
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def save_dir(settings):
+    """Return the directory saves are kept in
+
+    Args:
+        settings (Settings): Game settings
+    """
+    return settings.save_dir or GAME_DIR
+
+
+def load_high_score(directory):
+    """Read the saved high score, broken or missing files count as 0
+
+    Args:
+        directory (str): Directory the high score is saved in
+
+    Returns:
+        int: The high score
+    """
+    try:
+        with open(os.path.join(directory, HIGH_SCORE_FILE)) as score_file:
+            high_score = json.load(score_file)
+    except (OSError, ValueError):
+        return 0
+    if type(high_score) is not int or high_score < 0:
+        return 0
+    return high_score
+
+
+def write_atomic(path, data):
+    """Replace a file in one step, it is never seen half written
+
+    Args:
+        path (str): File to write
+        data (str): New content
+    """
+    directory = os.path.dirname(path)
+    # Keep the mode of the file being replaced, new files get the usual
+    # mode instead of the owner-only one of mkstemp
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as temp_file:
+            temp_file.write(data)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def read_leaderboard(path):
+    """Read all valid entries of a leaderboard log
+
+    Args:
+        path (str): Leaderboard log
+
+    Returns:
+        list: Entries as dicts with player, score, level and time
+    """
+    entries = []
+    try:
+        with open(path) as log_file:
+            for line in log_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                if (isinstance(entry, dict)
+                        and isinstance(entry.get('player'), str)
+                        and type(entry.get('score')) is int
+                        and type(entry.get('time', 0)) in (int, float)):
+                    entries.append(entry)
+    except OSError:
+        pass
+    return entries
+
+
+class Persistence:
+    """A class to save high scores, checkpoints and the leaderboard
+
+    All file access happens on a background thread, the game only hands
+    over the data. Files are replaced atomically, so a crash or a kill
+    leaves either the old or the new version. The leaderboard is an
+    append-only log that is compacted to the best games of every player.
+    """
+
+    def __init__(self, ai_game, enabled=True):
+        """Start the writer thread
+
+        Args:
+            ai_game (AlienInvasion): Running instance of Alien Invasion
+            enabled (bool, optional): Write files. A disabled instance
+                ignores all calls, headless games use it.
+        """
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.stats = ai_game.stats
+        self.enabled = enabled
+        self.directory = save_dir(self.settings)
+        self.saved_high_score = self.stats.high_score
+        # Milliseconds played since the last checkpoint
+        self.since_checkpoint = 0.0
+
+        self.jobs = queue.Queue()
+        self.thread = None
+        if self.enabled:
+            self.thread = threading.Thread(target=self._run, daemon=True,
+                                           name='persistence')
+            self.thread.start()
+
+    def _run(self):
+        """Carry out queued jobs until None is queued
+        """
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            function, args = job
+            try:
+                function(*args)
+            except Exception as error:
+                # Saving must never take the game down, and one failed job
+                # must not stop the ones queued behind it
+                print(f"Could not save: {error!r}")
+
+    def _submit(self, function, *args):
+        """Queue a job for the writer thread
+
+        Args:
+            function (callable): Function to call
+            *args: Arguments for the function
+        """
+        if self.enabled:
+            self.jobs.put((function, args))
+
+    def _path(self, file_name):
+        """Return the path of a file in the save directory
+        """
+        return os.path.join(self.directory, file_name)
+
+    def update(self, dt_ms):
+        """Count played time and checkpoint the session regularly
+
+        Args:
+            dt_ms (float): Milliseconds played since the last call
+        """
+        self.since_checkpoint += dt_ms
+        if self.since_checkpoint >= self.settings.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Save the session and a new high score
+        """
+        self.since_checkpoint = 0.0
+        stats = self.stats
+        session = {
+            'player': self.settings.player_name,
+            'score': stats.score,
+            'level': stats.level,
+            'ships_left': stats.ships_left,
+            'high_score': stats.high_score,
+            'frame': self.ai_game.frame,
+            'time': time.time(),
+        }
+        self._submit(write_atomic, self._path(SESSION_FILE),
+                     json.dumps(session))
+        self.save_high_score()
+
+    def save_high_score(self):
+        """Save the high score if it changed since the last save
+        """
+        if self.stats.high_score != self.saved_high_score:
+            self.saved_high_score = self.stats.high_score
+            self._submit(write_atomic, self._path(HIGH_SCORE_FILE),
+                         json.dumps(self.stats.high_score))
+
+    def record_game(self):
+        """Add the finished game to the leaderboard and checkpoint
+        """
+        entry = {
+            'player': self.settings.player_name,
+            'score': self.stats.score,
+            'level': self.stats.level,
+            'time': time.time(),
+        }
+        self._submit(self._append_entry, entry)
+        self.checkpoint()
+
+    def _append_entry(self, entry):
+        """Append a leaderboard entry and drop the player's worst ones
+
+        Args:
+            entry (dict): Entry to add
+        """
+        path = self._path(LEADERBOARD_FILE)
+        line = json.dumps(entry) + '\n'
+        with open(path, 'a+') as log_file:
+            # Start on a new line if a crash cut the last entry short
+            if log_file.tell() > 0:
+                log_file.seek(log_file.tell() - 1)
+                if log_file.read(1) != '\n':
+                    line = '\n' + line
+            log_file.write(line)
+            log_file.flush()
+            os.fsync(log_file.fileno())
+
+        entries = read_leaderboard(path)
+        kept = self._best(entries, self.settings.leaderboard_size)
+        if len(kept) < len(entries):
+            kept.sort(key=lambda e: e.get('time', 0))
+            write_atomic(path, ''.join(json.dumps(e) + '\n' for e in kept))
+
+    @staticmethod
+    def _best(entries, size):
+        """Return the best entries of every player
+
+        Args:
+            entries (list): Leaderboard entries
+            size (int): Entries kept per player
+        """
+        by_player = {}
+        for entry in entries:
+            by_player.setdefault(entry['player'], []).append(entry)
+        best = []
+        for player_entries in by_player.values():
+            player_entries.sort(key=lambda e: e['score'], reverse=True)
+            best.extend(player_entries[:size])
+        return best
+
+    def leaderboard(self, player=None):
+        """Return the saved leaderboard, best scores first
+
+        Reads the file directly, so don't call it from the frame loop.
+
+        Args:
+            player (str, optional): Only return entries of this player
+        """
+        entries = read_leaderboard(self._path(LEADERBOARD_FILE))
+        if player is not None:
+            entries = [e for e in entries if e['player'] == player]
+        entries = self._best(entries, self.settings.leaderboard_size)
+        return sorted(entries, key=lambda e: e['score'], reverse=True)
+
+    def close(self, timeout=5.0):
+        """Finish all queued writes and stop the writer thread
+
+        Args:
+            timeout (float, optional): Seconds to wait for the writes
+        """
+        if self.thread is None:
+            return
+        self.jobs.put(None)
+        self.thread.join(timeout)
+        self.thread = None
@@ -0,0 +1,316 @@
+import csv
+import json
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+import pygame
+
+from fonts import get_font
+from surfaces import counted
+
+
+class FrameProfiler:
+    """A class to time the phases of every frame and count per-frame work
+
+    Only the most recent frames are kept, together with the slowest
+    frames that went over the frame budget. Both can be exported to a
+    Chrome trace (chrome://tracing, Perfetto) or to a CSV file.
+    """
+
+    def __init__(self, enabled=False, budget_ms=1000 / 60, history=3600,
+                 export_path=None):
+        """Initialize the profiler
+
+        Args:
+            enabled (bool, optional): Collect timings. A disabled profiler
+                costs close to nothing.
+            budget_ms (float, optional): Frame time counted as a spike
+            history (int, optional): Number of recent frames to keep
+            export_path (str, optional): File written by export(), a .csv
+                ending selects CSV, anything else a Chrome trace
+        """
+        self.enabled = enabled
+        self.budget_ms = budget_ms
+        self.export_path = export_path
+        self.show_overlay = False
+
+        self.frames = deque(maxlen=history)
+        self.spikes = deque(maxlen=100)
+        self.phase_names = []
+        self._frame = None
+        self._frame_index = 0
+        self._origin = perf_counter()
+
+        self.font = None
+        self.overlay_image = None
+
+    def begin_frame(self):
+        """Start timing a new frame
+        """
+        if not self.enabled:
+            return
+        self._frame = {
+            'frame': self._frame_index,
+            'start': perf_counter(),
+            'phases': [],
+            'counters': {},
+        }
+        self._frame_index += 1
+
+    def end_frame(self):
+        """Finish the current frame and store it
+        """
+        frame = self._frame
+        if frame is None:
+            return
+        frame['duration'] = perf_counter() - frame['start']
+        self.frames.append(frame)
+        if frame['duration'] * 1e3 > self.budget_ms:
+            self.spikes.append(frame)
+        self._frame = None
+
+    def phase(self, name):
+        """Return a context manager timing one phase of the current frame
+
+        Args:
+            name (str): Name of the phase
+        """
+        if self._frame is None:
+            return nullcontext()
+        return self._time_phase(name)
+
+    @contextmanager
+    def _time_phase(self, name):
+        """Time the wrapped block as phase name
+
+        Args:
+            name (str): Name of the phase
+        """
+        frame = self._frame
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            frame['phases'].append((name, start, perf_counter() - start))
+            if name not in self.phase_names:
+                self.phase_names.append(name)
+
+    def count(self, name, n=1):
+        """Add n to a counter of the current frame
+
+        Args:
+            name (str): Name of the counter
+            n (int, optional): Amount to add
+        """
+        if self._frame is not None:
+            counters = self._frame['counters']
+            counters[name] = counters.get(name, 0) + n
+
+    def percentiles(self, phase=None, ps=(50, 90, 99)):
+        """Return percentiles of frame or phase times in milliseconds
+
+        Args:
+            phase (str, optional): Phase to evaluate, whole frames if None
+            ps (tuple, optional): Percentiles to compute
+
+        Returns:
+            dict: Percentile mapped to the time in milliseconds
+        """
+        if phase is None:
+            times = [frame['duration'] for frame in self.frames]
+        else:
+            times = [sum(d for name, _, d in frame['phases'] if name == phase)
+                     for frame in self.frames]
+        if not times:
+            return {p: 0.0 for p in ps}
+
+        times.sort()
+        last = len(times) - 1
+        return {p: times[min(last, round(p / 100 * last))] * 1e3 for p in ps}
+
+    def draw_overlay(self, screen):
+        """Draw frame time percentiles and the last frame's counters
+
+        Args:
+            screen (pygame.Surface): Surface to draw to
+
+        Returns:
+            list: Rects drawn to
+        """
+        if not (self.enabled and self.show_overlay and self.frames):
+            return []
+
+        # Re-render the text only a few times per second
+        if self.overlay_image is None or self._frame_index % 15 == 0:
+            if self.font is None:
+                self.font = get_font(None, 24)
+            lines = []
+            for phase in [None] + self.phase_names:
+                p = self.percentiles(phase)
+                lines.append(f"{phase or 'frame'}: {p[50]:.2f} / "
+                             f"{p[90]:.2f} / {p[99]:.2f} ms")
+            for name, value in sorted(self.frames[-1]['counters'].items()):
+                lines.append(f"{name}: {value}")
+
+            images = [counted(self.font.render(line, True, (255, 255, 0)))
+                      for line in lines]
+            width = max(image.get_width() for image in images)
+            height = sum(image.get_height() for image in images)
+            self.overlay_image = counted(pygame.Surface((width, height)))
+            y = 0
+            for image in images:
+                self.overlay_image.blit(image, (0, y))
+                y += image.get_height()
+
+        rect = self.overlay_image.get_rect()
+        rect.bottomleft = screen.get_rect().bottomleft
+        return [screen.blit(self.overlay_image, rect)]
+
+    def _exported_frames(self):
+        """Return spikes and recent frames in frame order without doubles
+        """
+        frames = {frame['frame']: frame for frame in self.spikes}
+        frames.update((frame['frame'], frame) for frame in self.frames)
+        return [frames[index] for index in sorted(frames)]
+
+    def export(self, path=None):
+        """Write the recorded frames to a file
+
+        Args:
+            path (str, optional): File to write, export_path by default
+        """
+        path = path or self.export_path
+        if path is None:
+            return
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_chrome_trace(path)
+
+    def export_chrome_trace(self, path):
+        """Write the frames in the Chrome trace event format
+
+        Args:
+            path (str): File to write
+        """
+        def us(seconds):
+            return round((seconds - self._origin) * 1e6, 1)
+
+        events = []
+        for frame in self._exported_frames():
+            events.append({
+                'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0,
+                'ts': us(frame['start']),
+                'dur': round(frame['duration'] * 1e6, 1),
+                'args': {'frame': frame['frame'], **frame['counters']},
+            })
+            for name, start, duration in frame['phases']:
+                events.append({
+                    'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                    'ts': us(start), 'dur': round(duration * 1e6, 1),
+                })
+
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events}, trace_file)
+
+    def export_csv(self, path):
+        """Write one row per frame with phase times and counters
+
+        Args:
+            path (str): File to write
+        """
+        frames = self._exported_frames()
+        counter_names = sorted({name for frame in frames
+                                for name in frame['counters']})
+
+        with open(path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['frame', 'frame_ms']
+                            + [f"{name}_ms" for name in self.phase_names]
+                            + counter_names)
+            for frame in frames:
+                phase_ms = dict.fromkeys(self.phase_names, 0.0)
+                for name, _, duration in frame['phases']:
+                    phase_ms[name] += duration * 1e3
+                writer.writerow(
+                    [frame['frame'], f"{frame['duration'] * 1e3:.3f}"]
+                    + [f"{phase_ms[name]:.3f}" for name in self.phase_names]
+                    + [frame['counters'].get(name, 0)
+                       for name in counter_names])
+
+
+class StartupProfiler:
+    """A class to time the steps from launching the game to its first frame
+    """
+
+    def __init__(self, enabled=False):
+        """Start the clock
+
+        Args:
+            enabled (bool, optional): Record the steps
+        """
+        self.enabled = enabled
+        self.start = perf_counter()
+        self.stages = []
+        self.first_frame = None
+
+    def stage(self, name):
+        """Return a context manager timing one startup step
+
+        Args:
+            name (str): Name of the step
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._time_stage(name)
+
+    @contextmanager
+    def _time_stage(self, name):
+        """Time the wrapped block as step name
+
+        Args:
+            name (str): Name of the step
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, perf_counter() - start,
+                                self.first_frame is not None))
+
+    def frame_done(self):
+        """Note the end of a frame, the first one is reported
+
+        Returns:
+            bool: True for the first frame
+        """
+        if self.first_frame is not None:
+            return False
+        self.first_frame = perf_counter() - self.start
+        return True
+
+    def report(self, lazy=False) -> str:
+        """Return the timed steps and the time to the first frame
+
+        Args:
+            lazy (bool, optional): Return the steps built lazily after the
+                first frame instead, or '' if there were none
+
+        Returns:
+            str: The report
+        """
+        stages = [(name, duration) for name, duration, after in self.stages
+                  if after == lazy]
+        if lazy:
+            if not stages:
+                return ''
+            lines = ['Built lazily after the first frame:']
+        else:
+            lines = ['Startup profile:']
+        for name, duration in stages:
+            lines.append(f"  {name:<24} {duration * 1e3:8.2f} ms")
+        if not lazy and self.first_frame is not None:
+            lines.append(f"  {'first frame':<24} "
+                         f"{self.first_frame * 1e3:8.2f} ms")
+        return '\n'.join(lines)
@@ -0,0 +1,94 @@
+import pygame
+
+from surfaces import counted
+
+
+class DirtyRenderer:
+    """A class to redraw only the parts of the screen that changed
+
+    The baked starfield is used as the background. Every frame the areas
+    drawn in the last frame are restored from it, the scene is drawn again
+    and only the touched rects are pushed to the display. Frames in which
+    nothing can change, like the paused game or the Play screen, are
+    skipped completely.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize the renderer
+
+        Args:
+            ai_game (AlienInvasion): Running instance of Alien Invasion
+        """
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        self.background = None
+        self.previous_rects = []
+        self.static_key = None
+
+    def invalidate(self):
+        """Rebuild the background and redraw the whole screen next frame
+        """
+        self.background = None
+        self.static_key = None
+
+    def _build_background(self):
+        """Pre-composite the background color and the stars
+        """
+        self.background = counted(pygame.Surface(self.screen.get_size()))
+        self.ai_game.starfield.blitme(self.background)
+
+    def _get_static_key(self):
+        """Return a key describing a frame without moving objects or None
+        while the game is running
+        """
+        ai_game = self.ai_game
+        if ai_game.state.playing:
+            return None
+        if ai_game.starfield.scrolling:
+            return None
+
+        stats = ai_game.stats
+        # Bullets can still be fired while the game is paused
+        return (ai_game.state.state, stats.score,
+                stats.high_score, stats.level, stats.ships_left,
+                len(ai_game.bullets), ai_game.profiler.show_overlay)
+
+    def render(self, draw_scene):
+        """Draw a frame and update the changed parts of the display
+
+        Args:
+            draw_scene (callable): Draws everything in front of the
+                background and returns the list of rects it drew to
+
+        Returns:
+            bool: False if the frame was skipped and nothing was presented
+        """
+        static_key = self._get_static_key()
+        if static_key is not None and static_key == self.static_key:
+            return False
+        self.static_key = static_key
+
+        # A scrolling sky changes the whole screen every frame
+        if self.ai_game.starfield.scrolling:
+            self.ai_game.starfield.blitme()
+            self.previous_rects = draw_scene()
+            pygame.display.flip()
+            return True
+
+        if self.background is None:
+            self._build_background()
+            self.screen.blit(self.background, (0, 0))
+            self.previous_rects = draw_scene()
+            pygame.display.flip()
+            return True
+
+        # Erase the last frame
+        for rect in self.previous_rects:
+            self.screen.blit(self.background, rect, rect)
+
+        rects = draw_scene()
+        pygame.display.update(self.previous_rects + rects)
+        self.previous_rects = rects
+        return True
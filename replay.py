@@ -0,0 +1,288 @@
+import argparse
+import struct
+import time
+
+import pygame
+
+from world_state import WorldState
+
+
+MAGIC = b'AIRP'
+VERSION = 1
+HEADER = struct.Struct('<4sBQ')
+
+# Event kinds stored in the stream
+(KEYDOWN, KEYUP, MOUSEBUTTONDOWN, JOYBUTTONDOWN, JOYBUTTONUP, JOYAXISMOTION,
+ JOYHATMOTION) = range(7)
+_KINDS = {
+    pygame.KEYDOWN: KEYDOWN,
+    pygame.KEYUP: KEYUP,
+    pygame.MOUSEBUTTONDOWN: MOUSEBUTTONDOWN,
+    pygame.JOYBUTTONDOWN: JOYBUTTONDOWN,
+    pygame.JOYBUTTONUP: JOYBUTTONUP,
+    pygame.JOYAXISMOTION: JOYAXISMOTION,
+    pygame.JOYHATMOTION: JOYHATMOTION,
+}
+_EVENT_TYPES = {kind: event_type for event_type, kind in _KINDS.items()}
+
+
+def _write_varint(buffer, value):
+    """Append an unsigned integer in LEB128 encoding
+
+    Args:
+        buffer (bytearray): Buffer to append to
+        value (int): Non-negative integer
+    """
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, pos):
+    """Read an unsigned LEB128 integer
+
+    Args:
+        data (bytes): Encoded data
+        pos (int): Position of the first byte
+
+    Returns:
+        tuple: The value and the position after it
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _read_entry(data, pos):
+    """Read the events of one frame entry
+
+    Args:
+        data (bytes): Encoded stream
+        pos (int): Position of the entry's event count
+
+    Returns:
+        tuple: The events and the position after the entry
+    """
+    count = data[pos]
+    pos += 1
+    events = []
+    for _ in range(count):
+        kind = data[pos]
+        pos += 1
+        event_type = _EVENT_TYPES[kind]
+        if kind == MOUSEBUTTONDOWN:
+            button = data[pos]
+            x, y = struct.unpack_from('<HH', data, pos + 1)
+            pos += 5
+            events.append(pygame.event.Event(
+                event_type, button=button, pos=(x, y)))
+        elif kind in (JOYBUTTONDOWN, JOYBUTTONUP):
+            events.append(pygame.event.Event(
+                event_type, button=data[pos], instance_id=0))
+            pos += 1
+        elif kind == JOYAXISMOTION:
+            value, = struct.unpack_from('<h', data, pos + 1)
+            events.append(pygame.event.Event(
+                event_type, axis=data[pos], value=value / 32767,
+                instance_id=0))
+            pos += 3
+        elif kind == JOYHATMOTION:
+            x, y = struct.unpack_from('<bb', data, pos + 1)
+            events.append(pygame.event.Event(
+                event_type, hat=data[pos], value=(x, y),
+                instance_id=0))
+            pos += 3
+        else:
+            key, pos = _read_varint(data, pos)
+            events.append(pygame.event.Event(event_type, key=key))
+    return events, pos
+
+
+class Recorder:
+    """A class to record the input of a game session into a binary stream
+
+    The stream starts with the game's seed. Only frames with input are
+    stored, each as the number of frames since the previous entry
+    followed by its events. Every entry is flushed right away, so a
+    session that crashed can be replayed up to its last input.
+    """
+
+    def __init__(self, path, seed):
+        """Open the stream and write its header
+
+        Args:
+            path (str): File to record to
+            seed (int): Seed the recorded game was created with
+        """
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+        self.file.flush()
+        self.last_frame = 0
+
+    def record_frame(self, frame, events):
+        """Record the events handled in a frame
+
+        Args:
+            frame (int): Number of the frame the events belong to
+            events (list): Pygame events of the frame. Events bound to
+                quitting must be left out, the game filters them by their
+                action.
+        """
+        kept = [event for event in events if event.type in _KINDS]
+        if kept:
+            self._write_entry(frame, kept)
+
+    def _write_entry(self, frame, events):
+        """Append one frame entry to the buffer
+
+        Args:
+            frame (int): Number of the frame
+            events (list): Events to store
+        """
+        buffer = bytearray()
+        _write_varint(buffer, frame - self.last_frame)
+        buffer.append(len(events))
+        for event in events:
+            kind = _KINDS[event.type]
+            buffer.append(kind)
+            if kind == MOUSEBUTTONDOWN:
+                buffer.append(event.button)
+                buffer += struct.pack('<HH', *event.pos)
+            elif kind in (JOYBUTTONDOWN, JOYBUTTONUP):
+                buffer.append(event.button)
+            elif kind == JOYAXISMOTION:
+                buffer.append(event.axis)
+                buffer += struct.pack('<h', round(event.value * 32767))
+            elif kind == JOYHATMOTION:
+                buffer.append(event.hat)
+                buffer += struct.pack('<bb', *event.value)
+            else:
+                _write_varint(buffer, event.key)
+        self.last_frame = frame
+        self.file.write(buffer)
+        self.file.flush()
+
+    def close(self, frame):
+        """Store the length of the session and close the stream
+
+        Args:
+            frame (int): Number of the last frame of the session
+        """
+        self._write_entry(frame, [])
+        self.file.close()
+
+
+class Replayer:
+    """A class to replay a recorded session through a headless game
+
+    While replaying, the game state is captured every checkpoint_interval
+    frames. Seeking restores the closest earlier checkpoint and only
+    simulates the remaining frames.
+    """
+
+    def __init__(self, path, checkpoint_interval=600):
+        """Load and decode a recorded stream
+
+        Args:
+            path (str): Recorded file
+            checkpoint_interval (int, optional): Frames between checkpoints
+        """
+        with open(path, 'rb') as replay_file:
+            data = replay_file.read()
+
+        magic, version, self.seed = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+
+        # Events by frame number
+        self.inputs = {}
+        frame = 0
+        pos = HEADER.size
+        while pos < len(data):
+            try:
+                delta, pos = _read_varint(data, pos)
+                events, pos = _read_entry(data, pos)
+            except (IndexError, struct.error):
+                # The stream of a crashed session can end mid-entry, it is
+                # replayed up to the last complete one
+                break
+            frame += delta
+            if events:
+                # Several drawn frames can fall before the same update
+                self.inputs.setdefault(frame, []).extend(events)
+        self.length = frame
+
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = {}
+        self.game = None
+
+    def start(self, ai_game_class, settings=None):
+        """Create the headless game the session is replayed in
+
+        Args:
+            ai_game_class (type): AlienInvasion or a subclass of it
+            settings (Settings, optional): Settings the session was
+                recorded with, key bindings included
+        """
+        self.game = ai_game_class(headless=True, seed=self.seed,
+                                  settings=settings)
+        self.checkpoints = {0: WorldState.capture(self.game)}
+        return self.game
+
+    def play(self, until_frame=None):
+        """Replay frames as fast as possible
+
+        Args:
+            until_frame (int, optional): Frame to stop at, the end of the
+                recording by default
+        """
+        if until_frame is None:
+            until_frame = self.length
+        game = self.game
+        while game.frame < until_frame:
+            # Events recorded for frame n were handled before updating to n
+            events = self.inputs.get(game.frame + 1)
+            game.step(1, [events] if events else None)
+            if game.frame % self.checkpoint_interval == 0:
+                if game.frame not in self.checkpoints:
+                    self.checkpoints[game.frame] = WorldState.capture(game)
+
+    def seek(self, frame):
+        """Jump to a frame of the recording
+
+        Args:
+            frame (int): Frame to jump to
+        """
+        start = max(f for f in self.checkpoints if f <= frame)
+        if frame < self.game.frame or start > self.game.frame:
+            self.checkpoints[start].restore(self.game)
+        self.play(frame)
+
+
+if __name__ == '__main__':
+    from alien_invasion import AlienInvasion
+
+    parser = argparse.ArgumentParser(
+        description='Replay a recorded session headlessly')
+    parser.add_argument('path', help='recording made with --record')
+    parser.add_argument('--seek', type=int, metavar='FRAME',
+                        help='stop at FRAME instead of the end')
+    args = parser.parse_args()
+
+    replayer = Replayer(args.path)
+    game = replayer.start(AlienInvasion)
+
+    start = time.perf_counter()
+    replayer.play(args.seek)
+    elapsed = time.perf_counter() - start
+
+    print(f"frames: {game.frame} of {replayer.length} in {elapsed:.3f} s "
+          f"({game.frame / max(elapsed, 1e-9):.0f} frames/s)")
+    print(f"score: {game.stats.score}  level: {game.stats.level}  "
+          f"ships left: {game.stats.ships_left}")
@@ -1,7 +1,9 @@
-import pygame.font 
-from pygame.sprite import Group
+import pygame
 
-from ship import Ship
+from asset_manager import assets
+from fonts import get_font
+from glyph_cache import CachedText
+from surfaces import counted
 
 class ScoreBoard:
     """A class to report scoring information
@@ -21,7 +23,19 @@ class ScoreBoard:
 
         # Font settings for scoring information
         self.text_color = (30, 30 , 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = get_font(None, 48)
+
+        # Numbers are composed from cached glyphs, only changed digits
+        # are drawn again
+        self.score_text = CachedText(self.font, self.text_color)
+        self.high_score_text = CachedText(self.font, self.text_color)
+        self.level_text = CachedText(self.font, self.text_color)
+
+        # Life icon strips by number of ships left
+        self.ship_strips = {}
+        # Score, level and ships composited into one layer, rebuilt
+        # whenever one of them changes
+        self.hud_image = None
 
         # Prepare the initial score image
         self.prep_score()
@@ -35,35 +49,37 @@ class ScoreBoard:
         """
         rounded_score = round(self.stats.score, -1)
         score_str = f"{rounded_score:,}" 
-        self.score_image = self.font.render(score_str, True,
-                            self.text_color, None)
+        self.score_image = self.score_text.set_text(score_str)
 
         # Display the score at the top of the top right of the screen
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - 20
         self.score_rect.top = 20
+        self.hud_image = None
 
 
     def show_score(self):
         """Draw scores, level and ships to the screen
+
+        Returns:
+            list: Rects drawn to
         """
-        self.screen.blit(self.score_image, self.score_rect) 
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect) 
-        self.ships.draw(self.screen)      
+        if self.hud_image is None:
+            self._prep_hud()
+        return [self.screen.blit(self.hud_image, self.hud_rect)]
 
     def prep_high_score(self):
         """Turn the high score into a rendered image
         """        
         high_score = round(self.stats.high_score, -1)
         high_score_str = f"{high_score:,}"
-        self.high_score_image = self.font.render(high_score_str, True,
-                                self.text_color, None)
+        self.high_score_image = self.high_score_text.set_text(high_score_str)
         
         # Center the high score at the top of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
         self.high_score_rect.centerx = self.screen_rect.centerx
         self.high_score_rect.top = self.score_rect.top
+        self.hud_image = None
 
     def check_high_score(self):
         """Check to see if there's a new high score
@@ -76,21 +92,56 @@ class ScoreBoard:
         """Turn the level into a rendered image
         """     
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str, True,
-                            self.text_color, None)
+        self.level_image = self.level_text.set_text(level_str)
 
         # Position the level below the score
         self.level_rect = self.level_image.get_rect()
         self.level_rect.right = self.score_rect.right
         self.level_rect.top = self.score_rect.bottom + 10   
+        self.hud_image = None
 
 
     def prep_ships(self):
         """Show how many ships are left
         """ 
-        self.ships = Group()
-        for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)      
+        # All lives share one icon, the strip is only built once per count
+        strip = self.ship_strips.get(self.stats.ships_left)
+        if strip is None:
+            icon = assets.get_image('images/ship.png',
+                                    (self.settings.ship_scale_width,
+                                     self.settings.ship_scale_height))
+            width = max(icon.get_width() * self.stats.ships_left, 1)
+            strip = counted(pygame.Surface((width, icon.get_height()),
+                                           pygame.SRCALPHA))
+            strip.blits([(icon, (ship_number * icon.get_width(), 0))
+                         for ship_number in range(self.stats.ships_left)],
+                        doreturn=False)
+            self.ship_strips[self.stats.ships_left] = strip
+
+        self.ships_image = strip
+        self.ships_rect = self.ships_image.get_rect()
+        self.ships_rect.topleft = (10, 10)
+        self.hud_image = None
+
+
+    def _prep_hud(self):
+        """Composite scores, level and ships into a single HUD layer
+        """
+        rects = [self.score_rect, self.high_score_rect, self.level_rect,
+                 self.ships_rect]
+        self.hud_rect = rects[0].unionall(rects[1:])
+        self.hud_image = counted(pygame.Surface(self.hud_rect.size,
+                                                pygame.SRCALPHA))
+
+        offset = (-self.hud_rect.x, -self.hud_rect.y)
+        self.hud_image.blits(
+            [(self.score_image, self.score_rect.move(offset)),
+             (self.high_score_image, self.high_score_rect.move(offset)),
+             (self.level_image, self.level_rect.move(offset)),
+             (self.ships_image, self.ships_rect.move(offset))],
+            doreturn=False)
+        # The layer is mostly transparent, run-length encoding lets the
+        # blit skip the empty parts
+        if pygame.display.get_surface() is not None:
+            self.hud_image = counted(self.hud_image.convert_alpha())
+        self.hud_image.set_alpha(255, pygame.RLEACCEL)
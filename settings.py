@@ -9,7 +9,15 @@ class Settings:
         self.screen_width = 1000
         self.screen_height = 600
         self.bg_color = (0, 13, 33)
+        # Frames drawn per second, 0 draws as fast as possible
         self.frame_rate = 60
+        # The game is updated in fixed steps, independent of the frame rate
+        self.update_rate = 60
+        # Speeds are given in pixels per update at this update rate
+        self.speed_reference_rate = 60
+        # 'full' redraws the whole screen every frame, 'dirty' only
+        # updates the parts of the screen that changed
+        self.render_mode = 'full'
 
         
         # Static Ship settings
@@ -19,6 +27,8 @@ class Settings:
         self.ship_scale_width = self.ship_scale_factor* self.ship_png_width
         self.ship_scale_height = self.ship_scale_factor * self.ship_png_height
         self.ship_limit = 2
+        # Milliseconds before the next round starts after a ship was hit
+        self.respawn_time = 500
 
         # Static Bullet settings 
         self.bullet_width = 3
@@ -29,12 +39,45 @@ class Settings:
         self.alien_scale_height = 40
         self.alien_speed = 5
         self.fleet_drop_speed = 1
+        # Aliens in the formation, None fills the screen. Patterns other
+        # than 'grid' leave some places of the formation empty.
+        self.fleet_size = None
+        # 'grid', 'checker', 'wedge' or 'diamond'
+        self.fleet_pattern = 'grid'
+        # Milliseconds a new fleet waits before it starts moving
+        self.level_transition_time = 500
 
         #Star settings
         self.star_scale_width = 10
         self.star_scale_height = 10
         self.star_rotation = 0
         self.stars_allowed = 50
+        # Pixels per frame the sky scrolls down, 0 keeps it still
+        self.star_scroll_speed = 0
+        # Directory to keep baked starfields in between runs, or None
+        self.starfield_cache_dir = None
+
+        # Input settings
+        # Keys by their pygame name and the action they trigger
+        self.key_bindings = {
+            'right': 'right', 'left': 'left', 'space': 'fire',
+            'r': 'new_game', 'p': 'pause', 'q': 'quit', 'f3': 'overlay',
+        }
+        # Gamepad buttons and the action they trigger, the left stick and
+        # the d-pad move the ship
+        self.gamepad_bindings = {0: 'fire', 6: 'new_game', 7: 'pause'}
+        # Stick deflection needed to move the ship
+        self.gamepad_deadzone = 0.5
+
+        # Saving settings
+        # Directory for the high score, checkpoints and the leaderboard,
+        # None keeps them next to the game
+        self.save_dir = None
+        self.player_name = 'player'
+        # Milliseconds of play between checkpoints of the session
+        self.checkpoint_interval = 10000
+        # Best games kept per player on the leaderboard
+        self.leaderboard_size = 10
 
         # How quickly the game speeds up
         self.speedup_scale = 1.1
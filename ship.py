@@ -1,6 +1,7 @@
-import pygame
 from pygame.sprite import Sprite
 
+from asset_manager import assets
+
 class Ship(Sprite):
     """A class to manage the ship 
     """    
@@ -14,11 +15,10 @@ class Ship(Sprite):
         self.settings = ai_game.settings
 
         # Load the ship image and get its rect.
-        self.image = pygame.image.load('images/ship.png')
-         # Resize the ship image to fit the screen
-        self.image = pygame.transform.scale(self.image, 
-                                        (self.settings.ship_scale_width,
-                                            self.settings.ship_scale_height))
+        # Resize the ship image to fit the screen
+        self.image = assets.get_image('images/ship.png',
+                                      (self.settings.ship_scale_width,
+                                       self.settings.ship_scale_height))
 
         self.rect = self.image.get_rect()
 
@@ -28,21 +28,37 @@ class Ship(Sprite):
         self.center_ship()
         
 
-    def blitme(self) -> None:
+    def blitme(self, alpha=1.0):
         """
-        Draw ship at its current location
+        Draw ship at its current location and return the drawn rect
+
+        Args:
+            alpha (float, optional): Position between the previous (0) and
+                the current (1) update to draw the ship at
         """        
-        self.screen.blit(self.image, self.rect)
+        rect = self.rect
+        if alpha != 1.0:
+            rect = rect.copy()
+            rect.x = self.x - (self.x - self.prev_x) * (1.0 - alpha)
+        return self.screen.blit(self.image, rect)
 
-    def update(self) -> None:
+    def update(self, dt=None) -> None:
         """
         Update the ships position based on the movement flag
+
+        Args:
+            dt (float, optional): Time step in seconds, one update at the
+                speed reference rate by default
         """        
+        speed = self.settings.ship_speed
+        if dt is not None:
+            speed *= dt * self.settings.speed_reference_rate
+
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += speed
         
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= speed
             
         # Update the rect position by self.x    
         self.rect.x = self.x
@@ -54,4 +70,5 @@ class Ship(Sprite):
         self.rect.midbottom = self.screen_rect.midbottom
 
         # Store the ships exact horizontal position as a float 
-        self.x  = float(self.rect.x)        
\ No newline at end of file
+        self.x  = float(self.rect.x)
+        self.prev_x = self.x        
\ No newline at end of file
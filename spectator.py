@@ -0,0 +1,331 @@
+import argparse
+import os
+import socket
+import stat
+import struct
+import zlib
+from collections import OrderedDict
+
+from world_state import WorldState
+
+
+# Snapshot number, number of the snapshot it is a delta against (0 for
+# none), length of the snapshot and length of the payload
+FRAME_HEADER = struct.Struct('<IIII')
+# Number of the last snapshot a spectator decoded
+ACK = struct.Struct('<I')
+
+# Snapshots kept to compute deltas against
+HISTORY = 64
+# Bytes queued for a spectator before frames are skipped
+MAX_BACKLOG = 1 << 16
+
+
+def parse_address(address):
+    """Return the socket family and address for 'host:port' or a path
+
+    Args:
+        address (str): TCP address as 'host:port' or a Unix socket path
+
+    Returns:
+        tuple: (family, address)
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit():
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    return socket.AF_UNIX, address
+
+
+def _xor(data, base):
+    """Return data xor base, base is padded or cut to the length of data
+
+    Args:
+        data (bytes): New snapshot
+        base (bytes): Snapshot to compare with
+    """
+    size = len(data)
+    base = base[:size].ljust(size, b'\0')
+    return (int.from_bytes(data, 'little')
+            ^ int.from_bytes(base, 'little')).to_bytes(size, 'little')
+
+
+class _Spectator:
+    """A connected spectator as seen by the server
+    """
+
+    def __init__(self, conn):
+        """Wrap a new connection
+
+        Args:
+            conn (socket.socket): Connection to the spectator
+        """
+        self.conn = conn
+        self.acked = 0
+        self.inbox = b''
+        self.outbox = b''
+
+
+class SpectatorServer:
+    """A class to stream the game to spectators over a local socket
+
+    Each update the world state is sent to every spectator as a delta
+    against the last snapshot the spectator acknowledged. Unchanged bytes
+    xor to zero and compress to almost nothing. All sockets are
+    non-blocking, a slow spectator misses frames instead of stalling the
+    game.
+    """
+
+    def __init__(self, ai_game, address):
+        """Start listening for spectators
+
+        Args:
+            ai_game (AlienInvasion): Game to stream
+            address (str): TCP address as 'host:port' or a Unix socket
+                path. Port 0 picks a free port. A path that exists and is
+                not a socket raises FileExistsError.
+        """
+        self.ai_game = ai_game
+        family, bind_address = parse_address(address)
+        if family == socket.AF_UNIX and os.path.exists(bind_address):
+            # Only a socket left behind by an earlier game is replaced,
+            # never a file that happens to have the name
+            if not stat.S_ISSOCK(os.stat(bind_address).st_mode):
+                raise FileExistsError(
+                    f"{bind_address} exists and is not a socket")
+            os.unlink(bind_address)
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET,
+                                     socket.SO_REUSEADDR, 1)
+        self.listener.bind(bind_address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+        self.family = family
+        self.address = self.listener.getsockname()
+
+        self.spectators = []
+        self.world = WorldState()
+        self.snapshots = OrderedDict()
+        self.seq = 0
+        self.bytes_sent = 0
+
+    def publish(self):
+        """Send the current world state to all spectators
+        """
+        self._accept()
+        if not self.spectators:
+            return
+
+        self.world.save(self.ai_game)
+        self.seq += 1
+        snapshot = self.world.to_bytes()
+        self.snapshots[self.seq] = snapshot
+        if len(self.snapshots) > HISTORY:
+            self.snapshots.popitem(last=False)
+
+        # Spectators acknowledging the same snapshot share one delta
+        frames = {}
+        for spectator in list(self.spectators):
+            if not self._read_acks(spectator):
+                continue
+            if len(spectator.outbox) < MAX_BACKLOG:
+                base_seq = spectator.acked
+                if base_seq not in self.snapshots:
+                    base_seq = 0
+                frame = frames.get(base_seq)
+                if frame is None:
+                    frame = frames[base_seq] = self._encode(snapshot,
+                                                            base_seq)
+                spectator.outbox += frame
+            self._flush(spectator)
+
+    def _encode(self, snapshot, base_seq):
+        """Return a frame with the snapshot as a delta against base_seq
+
+        Args:
+            snapshot (bytes): Current snapshot
+            base_seq (int): Snapshot to compare with, 0 for none
+        """
+        if base_seq:
+            payload = _xor(snapshot, self.snapshots[base_seq])
+        else:
+            payload = snapshot
+        payload = zlib.compress(payload, 1)
+        return FRAME_HEADER.pack(self.seq, base_seq, len(snapshot),
+                                 len(payload)) + payload
+
+    def _accept(self):
+        """Take in new spectators
+        """
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+            conn.setblocking(False)
+            if self.family == socket.AF_INET:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.spectators.append(_Spectator(conn))
+
+    def _read_acks(self, spectator):
+        """Read the acknowledgements a spectator sent
+
+        Args:
+            spectator (_Spectator): Spectator to read from
+
+        Returns:
+            bool: False if the spectator disconnected
+        """
+        try:
+            while True:
+                data = spectator.conn.recv(4096)
+                if not data:
+                    self._drop(spectator)
+                    return False
+                spectator.inbox += data
+        except BlockingIOError:
+            pass
+        except OSError:
+            self._drop(spectator)
+            return False
+
+        count = len(spectator.inbox) // ACK.size
+        if count:
+            spectator.acked, = ACK.unpack_from(spectator.inbox,
+                                               (count - 1) * ACK.size)
+            spectator.inbox = spectator.inbox[count * ACK.size:]
+        return True
+
+    def _flush(self, spectator):
+        """Send as much of a spectator's queued data as the socket takes
+
+        Args:
+            spectator (_Spectator): Spectator to send to
+        """
+        try:
+            sent = spectator.conn.send(spectator.outbox)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._drop(spectator)
+            return
+        spectator.outbox = spectator.outbox[sent:]
+        self.bytes_sent += sent
+
+    def _drop(self, spectator):
+        """Disconnect a spectator
+
+        Args:
+            spectator (_Spectator): Spectator to drop
+        """
+        spectator.conn.close()
+        self.spectators.remove(spectator)
+
+    def close(self):
+        """Disconnect all spectators and stop listening
+        """
+        for spectator in list(self.spectators):
+            self._drop(spectator)
+        self.listener.close()
+        if self.family == socket.AF_UNIX:
+            os.unlink(self.address)
+
+
+class SpectatorClient:
+    """A class to receive the world states a SpectatorServer streams
+    """
+
+    def __init__(self, address):
+        """Connect to a game
+
+        Args:
+            address (str or tuple): Address of the server, as passed to
+                the server or its address attribute
+        """
+        if isinstance(address, str):
+            family, address = parse_address(address)
+        else:
+            family = socket.AF_INET
+        self.conn = socket.socket(family, socket.SOCK_STREAM)
+        self.conn.connect(address)
+        if family == socket.AF_INET:
+            self.conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = b''
+        self.snapshots = OrderedDict()
+        self.bytes_received = 0
+
+    def receive(self, timeout=0.0):
+        """Return the newest world state that arrived, or None
+
+        Args:
+            timeout (float, optional): Seconds to wait for data, 0 to
+                return right away
+
+        Returns:
+            WorldState: The newest world state
+        """
+        # Wait for the first data only, then take what has arrived
+        self.conn.settimeout(timeout)
+        try:
+            while True:
+                data = self.conn.recv(1 << 16)
+                if not data:
+                    raise ConnectionError('the game ended the stream')
+                self.buffer += data
+                self.bytes_received += len(data)
+                self.conn.settimeout(0.0)
+        except (BlockingIOError, socket.timeout):
+            pass
+
+        newest_seq = newest = None
+        while len(self.buffer) >= FRAME_HEADER.size:
+            seq, base_seq, size, payload_size = \
+                FRAME_HEADER.unpack_from(self.buffer)
+            end = FRAME_HEADER.size + payload_size
+            if len(self.buffer) < end:
+                break
+            payload = zlib.decompress(self.buffer[FRAME_HEADER.size:end])
+            self.buffer = self.buffer[end:]
+            if base_seq:
+                payload = _xor(payload, self.snapshots[base_seq])
+            newest_seq, newest = seq, payload[:size]
+
+        if newest is None:
+            return None
+        # Only acknowledged snapshots are used as a base by the server
+        self.snapshots[newest_seq] = newest
+        if len(self.snapshots) > HISTORY:
+            self.snapshots.popitem(last=False)
+        self.conn.settimeout(1.0)
+        self.conn.sendall(ACK.pack(newest_seq))
+        return WorldState.from_bytes(newest)
+
+    def close(self):
+        """Disconnect from the game
+        """
+        self.conn.close()
+
+
+if __name__ == '__main__':
+    import pygame
+
+    from alien_invasion import AlienInvasion
+
+    parser = argparse.ArgumentParser(
+        description='Watch a game started with --spectate')
+    parser.add_argument('address', help="'host:port' or a Unix socket path")
+    args = parser.parse_args()
+
+    client = SpectatorClient(args.address)
+    # The spectator's own game is only used to draw the received states
+    game = AlienInvasion(seed=0)
+    pygame.display.set_caption('Alien Invasion - Spectator')
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                client.close()
+                raise SystemExit
+        world = client.receive(timeout=0.1)
+        if world is not None:
+            world.restore(game)
+            game._update_screen()
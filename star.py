@@ -1,6 +1,7 @@
-import pygame
 from pygame.sprite import Sprite
 
+from asset_manager import assets
+
 
 class Star(Sprite):
     """A class representing a single star at the screen 
@@ -11,22 +12,24 @@ class Star(Sprite):
         self.settings = ai_game.settings
         self.screen = ai_game.screen
 
-        #Load the alien image and set its rect attribute
-        self.image = pygame.image.load('images/star.png')
+        #Scale the star to default size and rotate it by the default angle
+        self.width = self.settings.star_scale_width
+        self.height = self.settings.star_scale_height
+        self.angle = self.settings.star_rotation
+        self._load_image()
 
-        #Scale the star to default size
-        self.scale(self.settings.star_scale_width, 
-                   self.settings.star_scale_height)
-     
-        #Rotate the star by the default angle
-        self.rotate(self.settings.star_rotation)
-        
         self.rect = self.image.get_rect()
 
         #Start each star near the top left of the screen
         self.rect.x = self.rect.width
         self.rect.y = self.rect.height
 
+    def _load_image(self):
+      """Fetch the scaled and rotated star image from the asset cache
+      """
+      self.image = assets.get_image('images/star.png',
+                                    (self.width, self.height), self.angle)
+
     def rotate(self, rotation_angle):
       """Rotate the star image by the given angle
 
@@ -34,7 +37,7 @@ class Star(Sprite):
           rotation_angle (int): Rotation angle
       """        
       self.angle = rotation_angle
-      self.image = pygame.transform.rotate(self.image, self.angle)
+      self._load_image()
 
     def scale(self, width, height):
       """Scale the star
@@ -43,9 +46,5 @@ class Star(Sprite):
           width (int): Width the star is scaled to
           height (int): Height the star is scaled to
       """       
-      self.image = pygame.transform.scale(self.image, (width, height))
-                                           
-
-        
-
-        
\ No newline at end of file
+      self.width, self.height = width, height
+      self._load_image()
@@ -0,0 +1,148 @@
+import os
+import random
+from collections import OrderedDict
+
+import pygame
+
+from star import Star
+from surfaces import counted
+
+
+# Baked starfields shared by all games, keyed by their parameters. The
+# least recently used ones are dropped, every new seed bakes a new sky.
+MAX_STARFIELDS = 4
+_starfields = OrderedDict()
+
+
+class Starfield:
+    """A class for the starry sky, baked into a single background surface
+
+    The background color and all stars are drawn once per screen size and
+    seed. Drawing the sky is then a single blit, no matter how many stars
+    it has. With a scroll speed the surface is used as a vertically tiled
+    strip.
+    """
+
+    def __init__(self, ai_game, seed=None):
+        """Bake or reuse the starfield for the current settings
+
+        Args:
+            ai_game (AlienInvasion): Running instance of Alien Invasion
+            seed (int, optional): Seed for the star positions. A random
+                seed is used if None.
+        """
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+
+        self.scroll_speed = self.settings.star_scroll_speed
+        self.scroll_y = 0.0
+
+        key = (self.screen.get_size(), self.seed, self.settings.stars_allowed,
+               self.settings.star_scale_width, self.settings.bg_color)
+        self.image = _starfields.get(key)
+        if self.image is None:
+            self.image = self._load_or_bake(key)
+            _starfields[key] = self.image
+            if len(_starfields) > MAX_STARFIELDS:
+                _starfields.popitem(last=False)
+        else:
+            _starfields.move_to_end(key)
+
+    def _load_or_bake(self, key):
+        """Load the starfield from the cache directory or bake a new one
+
+        Args:
+            key (tuple): Parameters of the starfield
+        """
+        cache_dir = self.settings.starfield_cache_dir
+        if cache_dir is None:
+            return self._bake()
+
+        (width, height), seed, count, scale, color = key
+        file_name = (f"starfield_{width}x{height}_{seed}_{count}_{scale}_"
+                     f"{'-'.join(str(c) for c in color)}.png")
+        path = os.path.join(cache_dir, file_name)
+
+        if os.path.exists(path):
+            image = counted(pygame.image.load(path))
+            if pygame.display.get_surface() is not None:
+                image = counted(image.convert())
+            return image
+
+        image = self._bake()
+        os.makedirs(cache_dir, exist_ok=True)
+        pygame.image.save(image, path)
+        return image
+
+    def _bake(self):
+        """Draw the background color and randomly placed stars
+        """
+        rng = random.Random(self.seed)
+        image = counted(pygame.Surface(self.screen.get_size()))
+        image.fill(self.settings.bg_color)
+        width, height = image.get_size()
+
+        stars = []
+        for _ in range(self.settings.stars_allowed):
+            # Set random position
+            x_position = rng.randint(0, width)
+            y_position = rng.randint(0, height)
+
+            # Set scaling, width and height should be equal
+            star_width = rng.randint(1, self.settings.star_scale_width)
+
+            # Rotate by random angle
+            rotation_angle = rng.randint(0, 45)
+
+            star = Star(self.ai_game)
+            star.rect.x = x_position
+            star.rect.y = y_position
+            star.scale(star_width, star_width)
+            star.rotate(rotation_angle)
+            stars.append((star.image, star.rect))
+
+        image.blits(stars, doreturn=False)
+        return image
+
+    @property
+    def scrolling(self) -> bool:
+        """True if the sky is moving
+        """
+        return self.scroll_speed != 0
+
+    def update(self, dt=None):
+        """Scroll the sky downwards
+
+        Args:
+            dt (float, optional): Time step in seconds, one update at the
+                speed reference rate by default
+        """
+        if self.scrolling:
+            speed = self.scroll_speed
+            if dt is not None:
+                speed *= dt * self.settings.speed_reference_rate
+            self.scroll_y = (self.scroll_y + speed) % self.image.get_height()
+
+    def blitme(self, surface=None):
+        """Draw the sky
+
+        Args:
+            surface (pygame.Surface, optional): Surface to draw to, the
+                screen by default
+        """
+        if surface is None:
+            surface = self.screen
+
+        if not self.scrolling:
+            surface.blit(self.image, (0, 0))
+            return
+
+        # Draw the strip twice so it wraps around at the bottom
+        offset = int(self.scroll_y)
+        surface.blit(self.image, (0, offset))
+        surface.blit(self.image, (0, offset - self.image.get_height()))
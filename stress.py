@@ -0,0 +1,178 @@
+import argparse
+import math
+import random
+import tracemalloc
+from time import perf_counter
+
+from alien_invasion import AlienInvasion
+from settings import Settings
+
+
+def stress_settings(aliens, width, height, pattern='grid'):
+    """Return settings for a fleet of the given size filling the screen
+
+    Args:
+        aliens (int): Number of places in the formation
+        width (int): Screen width
+        height (int): Screen height
+        pattern (str, optional): Fleet pattern
+
+    Returns:
+        Settings: Settings with the alien size scaled down to fit
+    """
+    settings = Settings()
+    settings.screen_width = width
+    settings.screen_height = height
+    # Every alien takes up a place twice its size in both directions,
+    # keep the 3:2 shape of the alien image. Shrink the aliens until the
+    # formation ends above the ship.
+    scale = math.sqrt(width * height / (4 * aliens))
+    while True:
+        alien_width = max(1, int(scale * math.sqrt(1.5)))
+        alien_height = max(1, int(scale / math.sqrt(1.5)))
+        columns = len(range(alien_width, width - 2 * alien_width,
+                            2 * alien_width))
+        rows = math.ceil(aliens / max(columns, 1))
+        bottom = alien_height + 2 * alien_height * rows
+        if (bottom <= height - settings.ship_scale_height
+                or alien_width == alien_height == 1):
+            break
+        scale *= 0.95
+    settings.alien_scale_width = alien_width
+    settings.alien_scale_height = alien_height
+    settings.fleet_size = aliens
+    settings.fleet_pattern = pattern
+    return settings
+
+
+def _create_sprites(ai_game):
+    """Create a sprite for every alien of the fleet
+
+    Args:
+        ai_game (AlienInvasion): Game to build the fleet in
+    """
+    for index, alive in enumerate(ai_game.fleet.alive):
+        if alive:
+            ai_game._create_alien(index)
+
+
+def run_stress(aliens, width=3840, height=2160, pattern='grid', frames=120,
+               bullets=100, seed=0):
+    """Build a large fleet and time updating, colliding and drawing it
+
+    Args:
+        aliens (int): Number of places in the formation
+        width (int, optional): Screen width
+        height (int, optional): Screen height
+        pattern (str, optional): Fleet pattern
+        frames (int, optional): Number of frames to time
+        bullets (int, optional): Bullets tested against the fleet
+        seed (int, optional): Seed for the game and the bullet positions
+
+    Returns:
+        dict: Sizes, memory and mean times in milliseconds
+    """
+    settings = stress_settings(aliens, width, height, pattern)
+    # Start without aliens, so only the stressed fleet is measured
+    settings.fleet_size = 0
+    ai_game = AlienInvasion(headless=True, seed=seed, settings=settings)
+    settings.fleet_size = aliens
+    fleet = ai_game.fleet
+    # Bake the sky before timing
+    ai_game.starfield
+
+    # Measure memory first, tracing slows down allocations a lot
+    tracemalloc.start()
+    fleet.build()
+    array_bytes = tracemalloc.get_traced_memory()[0]
+    _create_sprites(ai_game)
+    sprite_bytes = tracemalloc.get_traced_memory()[0] - array_bytes
+    tracemalloc.stop()
+
+    # Free the traced fleet before timing a new one
+    ai_game.aliens.empty()
+    fleet.views = fleet.sprites = {}
+    start = perf_counter()
+    fleet.build()
+    build_time = perf_counter() - start
+    start = perf_counter()
+    _create_sprites(ai_game)
+    sprite_time = perf_counter() - start
+
+    rng = random.Random(seed)
+    settings.bullets_allowed = bullets
+    for _ in range(bullets):
+        ai_game.bullet_pool.fire((rng.randrange(width),
+                                  rng.randrange(height)))
+
+    update = collision = draw = 0.0
+    for _ in range(frames):
+        start = perf_counter()
+        ai_game._check_fleet_edges()
+        fleet.move(ai_game.dt)
+        updated = perf_counter()
+        fleet.collide_bullets(ai_game.bullets, False, False)
+        collided = perf_counter()
+        ai_game.starfield.blitme()
+        ai_game._draw_scene()
+        drawn = perf_counter()
+
+        update += updated - start
+        collision += collided - updated
+        draw += drawn - collided
+
+    alive = max(fleet.alive_count, 1)
+    frame_time = (update + collision + draw) / frames
+    return {
+        'aliens': fleet.alive_count,
+        'alien_size': (settings.alien_scale_width,
+                       settings.alien_scale_height),
+        'build_ms': build_time * 1e3,
+        'sprites_ms': sprite_time * 1e3,
+        'array_bytes_per_alien': array_bytes / alive,
+        'sprite_bytes_per_alien': sprite_bytes / alive,
+        'update_ms': update / frames * 1e3,
+        'collision_ms': collision / frames * 1e3,
+        'draw_ms': draw / frames * 1e3,
+        'fps': 1 / frame_time if frame_time else 0.0,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Stress the game with very large alien fleets')
+    parser.add_argument('--aliens', type=int, nargs='+',
+                        default=[10000, 50000, 100000],
+                        help='fleet sizes to test')
+    parser.add_argument('--size', default='3840x2160', metavar='WxH',
+                        help='screen size, default 3840x2160')
+    parser.add_argument('--pattern', default='grid',
+                        choices=['grid', 'checker', 'wedge', 'diamond'],
+                        help='fleet pattern')
+    parser.add_argument('--frames', type=int, default=120,
+                        help='frames to time per fleet size')
+    parser.add_argument('--bullets', type=int, default=100,
+                        help='bullets in flight')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        width, height = (int(n) for n in args.size.lower().split('x'))
+    except ValueError:
+        parser.error(f"invalid screen size '{args.size}'")
+
+    print(f"{'aliens':>8} {'size':>6} {'build':>9} {'sprites':>9} "
+          f"{'B/alien':>13} {'update':>9} {'collide':>9} {'draw':>9} "
+          f"{'fps':>7}")
+    for aliens in args.aliens:
+        result = run_stress(aliens, width, height, args.pattern,
+                            args.frames, args.bullets, args.seed)
+        size = '{}x{}'.format(*result['alien_size'])
+        print(f"{result['aliens']:>8} {size:>6} "
+              f"{result['build_ms']:>6.1f} ms "
+              f"{result['sprites_ms']:>6.1f} ms "
+              f"{result['array_bytes_per_alien']:>4.0f} + "
+              f"{result['sprite_bytes_per_alien']:>6.0f} "
+              f"{result['update_ms']:>6.2f} ms "
+              f"{result['collision_ms']:>6.2f} ms "
+              f"{result['draw_ms']:>6.2f} ms {result['fps']:>7.1f}")
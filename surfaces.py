@@ -0,0 +1,20 @@
+# Surfaces the game has created so far, the frame profiler counts the
+# difference per frame
+allocated = 0
+
+
+def counted(surface):
+    """Count a newly created surface and return it
+
+    Wraps every call that makes a surface, like pygame.Surface(),
+    Font.render(), convert() or the transforms.
+
+    Args:
+        surface (pygame.Surface): The new surface
+
+    Returns:
+        pygame.Surface: The same surface
+    """
+    global allocated
+    allocated += 1
+    return surface
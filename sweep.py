@@ -0,0 +1,448 @@
+import argparse
+import ast
+import csv
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from env import (ACTIONS, FIRE, LEFT, LEFT_FIRE, NOOP, RIGHT, RIGHT_FIRE,
+                 AlienInvasionEnv)
+from persistence import write_atomic
+from settings import Settings
+
+
+# Columns describing how a game was played, games only compare if these
+# and the swept settings are the same
+GAME_FIELDS = ['policy', 'max_time', 'curve_interval', 'frame_skip',
+               'epsilon']
+# Columns every result row has after the swept parameters
+RESULT_FIELDS = GAME_FIELDS + ['seed', 'level', 'score', 'duration',
+                               'deaths', 'score_curve', 'timed_out']
+POLICIES = ('random', 'scripted')
+
+
+class _SweepSettings(Settings):
+    """Settings with some values replaced for a whole game
+
+    The values are applied again whenever the dynamic settings are reset,
+    so swept starting speeds and point values survive a new game.
+    """
+
+    def __init__(self, params):
+        """Initialize the settings with the swept values
+
+        Args:
+            params (dict): Setting names mapped to their values
+        """
+        self.params = dict(params)
+        super().__init__()
+
+    def initialize_dynamic_settings(self):
+        """Initialize settings that change throughout the game
+        """
+        super().initialize_dynamic_settings()
+        for name, value in self.params.items():
+            setattr(self, name, value)
+
+
+def parse_param(text):
+    """Parse a '--param name=v1,v2,...' option
+
+    Values are Python literals, anything else is taken as a string.
+
+    Args:
+        text (str): The option value
+
+    Returns:
+        tuple: The setting name and the list of its values
+    """
+    name, sep, values = text.partition('=')
+    name = name.strip()
+    if not sep or not values:
+        raise argparse.ArgumentTypeError(
+            f"expected name=value,value,... but got '{text}'")
+    if not hasattr(Settings(), name):
+        raise argparse.ArgumentTypeError(f"unknown setting '{name}'")
+
+    parsed = []
+    for value in values.split(','):
+        try:
+            parsed.append(ast.literal_eval(value.strip()))
+        except (ValueError, SyntaxError):
+            parsed.append(value.strip())
+    return name, parsed
+
+
+def grid(params):
+    """Return every combination of the swept values
+
+    Args:
+        params (list): (name, values) pairs
+
+    Returns:
+        list: One dict of setting names and values per combination
+    """
+    names = [name for name, _ in params]
+    return [dict(zip(names, values))
+            for values in itertools.product(*(v for _, v in params))]
+
+
+def _scripted_action(game, rng, epsilon):
+    """Return the action of a simple scripted player
+
+    The player moves under the lowest alien, the one closest to the ship
+    if there are several, and fires whenever it can. With probability
+    epsilon a random action is taken instead, which makes games with
+    different seeds differ.
+
+    Args:
+        game (AlienInvasion): Game being played
+        rng (random.Random): Random numbers of the player
+        epsilon (float): Probability of a random action
+    """
+    if rng.random() < epsilon:
+        return rng.choice(ACTIONS)
+
+    fleet = game.fleet
+    ship_x = game.ship.rect.centerx
+    target = None
+    for index, alive in enumerate(fleet.alive):
+        if not alive:
+            continue
+        x = fleet.base_x[index] + fleet.offset_x + fleet.alien_width / 2
+        key = (-fleet.base_y[index], abs(x - ship_x))
+        if target is None or key < target[0]:
+            target = (key, x)
+    if target is None:
+        return NOOP
+
+    can_fire = len(game.bullet_pool.active) < game.settings.bullets_allowed
+    distance = target[1] - ship_x
+    if abs(distance) <= fleet.alien_width / 4:
+        return FIRE if can_fire else NOOP
+    if distance < 0:
+        return LEFT_FIRE if can_fire else LEFT
+    return RIGHT_FIRE if can_fire else RIGHT
+
+
+# Environment a worker process played its last game in and what it was
+# built for. Games with the same settings reuse it instead of building a
+# new game every time.
+_env = None
+_env_key = None
+
+
+def _reset_env(params, frame_skip):
+    """Return an environment for the settings with a new game started
+
+    Args:
+        params (dict): Setting names and the values to play with
+        frame_skip (int): Game updates per player decision
+    """
+    global _env, _env_key
+    key = (repr(sorted(params.items())), frame_skip)
+    if key != _env_key:
+        _env = AlienInvasionEnv(0, frame_skip, _SweepSettings(params))
+        _env_key = key
+    _env.reset()
+    return _env
+
+
+def play_game(params, policy, seed, max_time=600.0, curve_interval=10.0,
+              frame_skip=4, epsilon=0.05):
+    """Play a single headless game and measure how it went
+
+    Args:
+        params (dict): Setting names and the values to play with
+        policy (str): 'random' or 'scripted'
+        seed (int): Seed for the player
+        max_time (float, optional): Seconds of game time after which the
+            game is stopped
+        curve_interval (float, optional): Seconds of game time between
+            points of the score curve
+        frame_skip (int, optional): Game updates per player decision
+        epsilon (float, optional): Probability of a random action of the
+            scripted player
+
+    Returns:
+        dict: The policy, options and seed, the final level and score,
+            game time played, game times at which ships were lost, the
+            score curve and whether the game hit max_time. Lists are
+            joined with ';'.
+    """
+    env = _reset_env(params, frame_skip)
+    game = env.game
+    # The game plays out the same for every seed, only the player varies
+    rng = random.Random(seed)
+    start_frame = game.frame
+    ships_left = game.stats.ships_left
+    deaths = []
+    curve = [0]
+    next_point = curve_interval
+
+    done = False
+    elapsed = 0.0
+    while not done and elapsed < max_time:
+        if policy == 'random':
+            action = rng.choice(ACTIONS)
+        else:
+            action = _scripted_action(game, rng, epsilon)
+        _, _, done, info = env.step(action)
+        elapsed = (game.frame - start_frame) * game.dt
+
+        if done or info['ships_left'] < ships_left:
+            deaths.append(round(elapsed, 3))
+            ships_left = info['ships_left']
+        while elapsed >= next_point:
+            curve.append(info['score'])
+            next_point += curve_interval
+
+    return {
+        'policy': policy,
+        'max_time': max_time,
+        'curve_interval': curve_interval,
+        'frame_skip': frame_skip,
+        'epsilon': epsilon,
+        'seed': seed,
+        'level': game.stats.level,
+        'score': game.stats.score,
+        'duration': round(elapsed, 3),
+        'deaths': ';'.join(map(str, deaths)),
+        'score_curve': ';'.join(map(str, curve)),
+        'timed_out': int(not done),
+    }
+
+
+def _read_results(path, fieldnames):
+    """Read the rows an earlier sweep wrote and prepare the file for
+    appending
+
+    A last row cut short by an interruption is removed.
+
+    Args:
+        path (str): Results file
+        fieldnames (list): Columns the sweep writes
+
+    Returns:
+        list: The complete rows as dicts of strings
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path, newline='') as results_file:
+        data = results_file.read()
+    if not data:
+        return []
+
+    # Drop everything after the last complete line
+    complete = data[:data.rfind('\n') + 1]
+    if len(complete) < len(data):
+        with open(path, 'r+', newline='') as results_file:
+            results_file.truncate(len(complete.encode()))
+
+    reader = csv.DictReader(complete.splitlines())
+    if reader.fieldnames != fieldnames:
+        raise SystemExit(
+            f"{path} holds results of a different sweep, its columns are "
+            f"{reader.fieldnames}")
+    return [row for row in reader if None not in row.values()]
+
+
+def _row_key(row, names):
+    """Return what identifies a game of the sweep
+
+    Args:
+        row (dict): Result row or task
+        names (list): Names of the swept settings
+    """
+    return tuple(str(row[name]) for name in [*names, *GAME_FIELDS, 'seed'])
+
+
+def summarize(rows, names):
+    """Aggregate the games of every grid point
+
+    Args:
+        rows (list): Result rows, values may be strings
+        names (list): Names of the swept settings
+
+    Returns:
+        list: One dict per grid point, policy and options with the number of
+            games, mean and best level, mean and median score, mean time
+            to the first lost ship and to game over and the share of
+            games that hit the time limit
+    """
+    groups = {}
+    for row in rows:
+        key = tuple(str(row[name]) for name in [*names, *GAME_FIELDS])
+        groups.setdefault(key, []).append(row)
+
+    summary = []
+    for key, group in groups.items():
+        levels = [int(row['level']) for row in group]
+        scores = [int(row['score']) for row in group]
+        first_deaths = [float(str(row['deaths']).split(';')[0])
+                        for row in group if row['deaths'] != '']
+        game_overs = [float(row['duration']) for row in group
+                      if not int(row['timed_out'])]
+        summary.append({
+            **dict(zip([*names, *GAME_FIELDS], key)),
+            'games': len(group),
+            'mean_level': round(statistics.fmean(levels), 2),
+            'max_level': max(levels),
+            'mean_score': round(statistics.fmean(scores)),
+            'median_score': round(statistics.median(scores)),
+            'first_death': round(statistics.fmean(first_deaths), 1)
+            if first_deaths else '',
+            'game_over': round(statistics.fmean(game_overs), 1)
+            if game_overs else '',
+            'timed_out': round(1 - len(game_overs) / len(group), 3),
+        })
+    return summary
+
+
+def print_summary(summary):
+    """Print the aggregated results as a table
+
+    Args:
+        summary (list): Rows returned by summarize()
+    """
+    if not summary:
+        return
+    columns = list(summary[0])
+    widths = [max(len(column), *(len(str(row[column])) for row in summary))
+              for column in columns]
+    print('  '.join(c.rjust(w) for c, w in zip(columns, widths)))
+    for row in summary:
+        print('  '.join(str(row[c]).rjust(w) for c, w in zip(columns, widths)))
+
+
+def run_sweep(params, output, games=100, policy='random', seed=0,
+              workers=None, max_time=600.0, curve_interval=10.0,
+              frame_skip=4, epsilon=0.05):
+    """Play games for every grid point on all cores and stream the results
+    to a CSV file
+
+    Every finished game is written right away. Games already in the file
+    are skipped, so an interrupted sweep continues where it stopped when
+    it is run again. Games played with other options are kept apart, they
+    are never taken for games of this run. All grid points play the same
+    seeds.
+
+    Args:
+        params (list): (name, values) pairs of the swept settings
+        output (str): CSV file to write
+        games (int, optional): Games per grid point
+        policy (str, optional): 'random' or 'scripted'
+        seed (int, optional): Seed of the first game of every grid point
+        workers (int, optional): Number of worker processes, the number
+            of cores by default
+        max_time (float, optional): See play_game()
+        curve_interval (float, optional): See play_game()
+        frame_skip (int, optional): See play_game()
+        epsilon (float, optional): See play_game()
+
+    Returns:
+        list: All result rows in the file
+    """
+    names = [name for name, _ in params]
+    fieldnames = names + RESULT_FIELDS
+    rows = _read_results(output, fieldnames)
+    done = {_row_key(row, names) for row in rows}
+
+    # Same types as the values written, so they match as text
+    options = {'max_time': float(max_time),
+               'curve_interval': float(curve_interval),
+               'frame_skip': int(frame_skip), 'epsilon': float(epsilon)}
+    tasks = [(point, s) for point in grid(params)
+             for s in range(seed, seed + games)
+             if _row_key({**point, 'policy': policy, **options, 'seed': s},
+                         names) not in done]
+    print(f"{len(tasks)} games to play, {len(rows)} already in {output}")
+    if not tasks:
+        return rows
+
+    is_new = not rows and not (os.path.exists(output)
+                               and os.path.getsize(output))
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    context = multiprocessing.get_context('spawn')
+    with open(output, 'a', newline='') as results_file, \
+            ProcessPoolExecutor(workers, mp_context=context) as pool:
+        writer = csv.DictWriter(results_file, fieldnames)
+        if is_new:
+            writer.writeheader()
+        futures = {pool.submit(play_game, point, policy, s, **options):
+                   point for point, s in tasks}
+        try:
+            for count, future in enumerate(as_completed(futures), 1):
+                row = {**futures[future], **future.result()}
+                writer.writerow(row)
+                results_file.flush()
+                rows.append(row)
+                if count % 100 == 0 or count == len(tasks):
+                    print(f"{count}/{len(tasks)} games played")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            print(f"Interrupted after {len(rows)} games, run the same "
+                  f"command again to continue")
+            raise
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Play headless games over a grid of settings to '
+                    'balance the difficulty')
+    parser.add_argument('--param', action='append', type=parse_param,
+                        default=[], metavar='NAME=V1,V2,...',
+                        help='setting to sweep and its values, may be '
+                             'given several times')
+    parser.add_argument('--games', type=int, default=100,
+                        help='games per grid point, default 100')
+    parser.add_argument('--policy', choices=POLICIES, default='random',
+                        help='player of the games, default random')
+    parser.add_argument('--epsilon', type=float, default=0.05,
+                        help='chance of a random action of the scripted '
+                             'player, default 0.05')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first game, default 0')
+    parser.add_argument('--max-time', type=float, default=600.0,
+                        help='seconds of game time before a game is '
+                             'stopped, default 600')
+    parser.add_argument('--curve-interval', type=float, default=10.0,
+                        help='seconds of game time between points of the '
+                             'score curve, default 10')
+    parser.add_argument('--frame-skip', type=int, default=4,
+                        help='game updates per player decision, default 4')
+    parser.add_argument('--workers', type=int,
+                        help='worker processes, default one per core')
+    parser.add_argument('--output', default='sweep.csv',
+                        help='CSV file for the results of every game, '
+                             'default sweep.csv')
+    parser.add_argument('--summary',
+                        help='also write the aggregated results to this '
+                             'CSV file')
+    args = parser.parse_args()
+
+    names = [name for name, _ in args.param]
+    if len(set(names)) < len(names):
+        parser.error('every setting can only be swept once')
+
+    try:
+        rows = run_sweep(args.param, args.output, args.games, args.policy,
+                         args.seed, args.workers, max_time=args.max_time,
+                         curve_interval=args.curve_interval,
+                         frame_skip=args.frame_skip, epsilon=args.epsilon)
+    except KeyboardInterrupt:
+        raise SystemExit(130)
+
+    summary = summarize(rows, names)
+    print_summary(summary)
+    if args.summary and summary:
+        text = io.StringIO()
+        writer = csv.DictWriter(text, list(summary[0]))
+        writer.writeheader()
+        writer.writerows(summary)
+        write_atomic(os.path.abspath(args.summary), text.getvalue())
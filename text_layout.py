@@ -0,0 +1,87 @@
+import pygame
+
+from surfaces import counted
+
+
+# Rendered paragraphs shared by all texts, keyed by text, font, width and
+# colors
+_paragraphs = {}
+
+
+def wrap_text(text, font, width):
+    """Break a text into lines no wider than width
+
+    Lines are broken between words, explicit line breaks are kept. A
+    single word wider than width is broken between characters.
+
+    Args:
+        text (str): Text to wrap
+        font (pygame.font.Font): Font the text is rendered with
+        width (int): Maximum line width in pixels
+
+    Returns:
+        list: The lines
+    """
+    lines = []
+    for paragraph in text.split('\n'):
+        line = ''
+        for word in paragraph.split(' '):
+            candidate = f"{line} {word}" if line else word
+            if font.size(candidate)[0] <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            # Break words that don't fit on a line of their own
+            while font.size(word)[0] > width and len(word) > 1:
+                cut = len(word) - 1
+                while cut > 1 and font.size(word[:cut])[0] > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+def render_paragraph(text, font, width, color, background=None):
+    """Return a text wrapped to width and rendered into a single surface
+
+    Lines are centered. The surface is cached and shared, it must not be
+    drawn on.
+
+    Args:
+        text (str): Text to render
+        font (pygame.font.Font): Font to render with
+        width (int): Maximum line width in pixels
+        color (tuple): Text color
+        background (tuple, optional): Color behind every line, the space
+            around shorter lines stays transparent
+
+    Returns:
+        pygame.Surface: The rendered paragraph
+    """
+    key = (text, font, width, tuple(color),
+           background and tuple(background))
+    image = _paragraphs.get(key)
+    if image is not None:
+        return image
+
+    lines = [counted(font.render(line, True, color, background))
+             for line in wrap_text(text, font, width)]
+    image = counted(pygame.Surface(
+        (max(line.get_width() for line in lines),
+         sum(line.get_height() for line in lines)), pygame.SRCALPHA))
+    y = 0
+    for line in lines:
+        image.blit(line, ((image.get_width() - line.get_width()) // 2, y))
+        y += line.get_height()
+
+    # Mostly transparent or uniform, run-length encoding makes blitting
+    # it cheap
+    if pygame.display.get_surface() is not None:
+        image = counted(image.convert_alpha())
+    image.set_alpha(255, pygame.RLEACCEL)
+
+    _paragraphs[key] = image
+    return image
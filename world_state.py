@@ -0,0 +1,289 @@
+import math
+import struct
+import sys
+from array import array
+
+from game_state import GameState
+
+
+# Game states by their number in the scalar array
+STATES = (None, GameState.GAME_OVER, GameState.PLAYING, GameState.RESPAWNING,
+          GameState.LEVEL_TRANSITION, GameState.PAUSED)
+_STATE_NUMBERS = {state: number for number, state in enumerate(STATES)}
+
+# Layout of the scalar array
+(SHIP_SPEED, BULLET_SPEED, BULLETS_PIERCING, BULLETS_ALLOWED, ALIEN_SPEED,
+ FLEET_DIRECTION, ALIEN_POINTS,
+ SHIPS_LEFT, SCORE, LEVEL, HIGH_SCORE,
+ STATE, TIMER, RESUME_STATE, FRAME,
+ SHIP_X, SHIP_PREV_X, SHIP_RECT_X, SHIP_RECT_Y, MOVING_RIGHT, MOVING_LEFT,
+ OFFSET_X, OFFSET_Y, PREV_OFFSET_X, PREV_OFFSET_Y, COLUMNS, ROWS,
+ SCROLL_Y) = range(28)
+SCALARS = 28
+
+# Arrays in the order they are stored by to_bytes()
+_ARRAYS = ('scalars', 'base_x', 'base_y', 'alive', 'bullet_xs', 'bullet_ys',
+           'bullet_prev_ys', 'bullet_speeds')
+# Magic, version, array lengths, random generator version and gauss_next
+_HEADER = struct.Struct('<4sB8IBd')
+# Bullet color
+_COLOR = struct.Struct('<3B')
+_MAGIC = b'AIWS'
+# Version 2 stores integer arrays as 8 bytes, little endian, everywhere
+_VERSION = 2
+
+
+class WorldState:
+    """A class holding a complete copy of a game in a few flat arrays
+
+    Everything that changes while playing, the dynamic settings, the
+    statistics, the ship, the fleet and the bullets in flight, is stored
+    in fixed-layout arrays. Taking and restoring a snapshot is a handful
+    of buffer copies, so a game can be rewound, saved or forked into many
+    simulations cheaply.
+    """
+
+    __slots__ = _ARRAYS + ('bullet_color', 'rng_state')
+
+    def __init__(self):
+        """Create an empty world state, fill it with save()
+        """
+        self.scalars = array('d', bytes(8 * SCALARS))
+        self.base_x = array('d')
+        self.base_y = array('q')
+        self.alive = array('b')
+        self.bullet_xs = array('q')
+        self.bullet_ys = array('d')
+        self.bullet_prev_ys = array('d')
+        self.bullet_speeds = array('d')
+        # Random generator states are immutable tuples, they are shared
+        # instead of copied
+        self.rng_state = None
+        self.bullet_color = None
+
+    @classmethod
+    def capture(cls, ai_game):
+        """Return a new world state holding the current game
+
+        Args:
+            ai_game (AlienInvasion): Game to capture
+        """
+        world = cls()
+        world.save(ai_game)
+        return world
+
+    def save(self, ai_game):
+        """Overwrite this world state with the current game
+
+        The arrays are reused, saving into the same world state again does
+        not allocate.
+
+        Args:
+            ai_game (AlienInvasion): Game to capture
+        """
+        settings, stats, state = ai_game.settings, ai_game.stats, \
+            ai_game.state
+        ship, fleet, pool = ai_game.ship, ai_game.fleet, ai_game.bullet_pool
+        starfield = ai_game._starfield
+
+        self.scalars[:] = array('d', (
+            settings.ship_speed, settings.bullet_speed,
+            settings.bullets_piercing, settings.bullets_allowed,
+            settings.alien_speed, settings.fleet_direction,
+            settings.alien_points,
+            stats.ships_left, stats.score, stats.level, stats.high_score,
+            _STATE_NUMBERS[state.state], state.timer,
+            _STATE_NUMBERS[state.resume_state], ai_game.frame,
+            ship.x, ship.prev_x, ship.rect.x, ship.rect.y,
+            ship.moving_right, ship.moving_left,
+            fleet.offset_x, fleet.offset_y, fleet.prev_offset_x,
+            fleet.prev_offset_y, fleet.columns, fleet.rows,
+            starfield.scroll_y if starfield is not None else 0.0,
+        ))
+        self.bullet_color = settings.bullet_color
+
+        self.base_x[:] = fleet.base_x
+        self.base_y[:] = fleet.base_y
+        self.alive[:] = fleet.alive
+
+        # Bullets in group order, collisions are tested in that order
+        bullets = ai_game.bullets.sprites()
+        slots = [bullet.slot for bullet in bullets]
+        self.bullet_xs[:] = array('q', [bullet.rect.x for bullet in bullets])
+        self.bullet_ys[:] = array('d', map(pool.ys.__getitem__, slots))
+        self.bullet_prev_ys[:] = array(
+            'd', map(pool.prev_ys.__getitem__, slots))
+        self.bullet_speeds[:] = array(
+            'd', map(pool.speeds.__getitem__, slots))
+        self.rng_state = ai_game.rng.getstate()
+
+    def restore(self, ai_game):
+        """Put a game back into this world state
+
+        Alien sprites of the current formation are reused, so restoring
+        does not create sprites unless the formation was rebuilt.
+
+        Args:
+            ai_game (AlienInvasion): Game to restore
+        """
+        s = self.scalars
+        settings, stats, state = ai_game.settings, ai_game.stats, \
+            ai_game.state
+        ship, fleet = ai_game.ship, ai_game.fleet
+
+        settings.ship_speed = s[SHIP_SPEED]
+        settings.bullet_speed = s[BULLET_SPEED]
+        settings.bullets_piercing = bool(s[BULLETS_PIERCING])
+        settings.bullets_allowed = int(s[BULLETS_ALLOWED])
+        settings.alien_speed = s[ALIEN_SPEED]
+        settings.fleet_direction = int(s[FLEET_DIRECTION])
+        settings.alien_points = int(s[ALIEN_POINTS])
+        settings.bullet_color = self.bullet_color
+
+        sb = ai_game.sb
+        old_stats = (stats.ships_left, stats.score, stats.level,
+                     stats.high_score)
+        stats.ships_left = int(s[SHIPS_LEFT])
+        stats.score = int(s[SCORE])
+        stats.level = int(s[LEVEL])
+        stats.high_score = int(s[HIGH_SCORE])
+        if old_stats[0] != stats.ships_left:
+            sb.prep_ships()
+        if old_stats[1] != stats.score:
+            sb.prep_score()
+        if old_stats[2] != stats.level:
+            sb.prep_level()
+        if old_stats[3] != stats.high_score:
+            sb.prep_high_score()
+
+        state.state = STATES[int(s[STATE])]
+        state.timer = s[TIMER]
+        state.resume_state = STATES[int(s[RESUME_STATE])]
+        ai_game.frame = int(s[FRAME])
+
+        ship.x = s[SHIP_X]
+        ship.prev_x = s[SHIP_PREV_X]
+        ship.rect.topleft = (int(s[SHIP_RECT_X]), int(s[SHIP_RECT_Y]))
+        ship.moving_right = bool(s[MOVING_RIGHT])
+        ship.moving_left = bool(s[MOVING_LEFT])
+
+        self._restore_fleet(ai_game)
+        fleet.offset_x = s[OFFSET_X]
+        fleet.offset_y = int(s[OFFSET_Y])
+        fleet.prev_offset_x = s[PREV_OFFSET_X]
+        fleet.prev_offset_y = int(s[PREV_OFFSET_Y])
+
+        pool = ai_game.bullet_pool
+        pool.clear()
+        for x, y, prev_y, speed in zip(self.bullet_xs, self.bullet_ys,
+                                       self.bullet_prev_ys,
+                                       self.bullet_speeds):
+            slot = pool.fire((x, int(y))).slot
+            pool.ys[slot] = y
+            pool.prev_ys[slot] = prev_y
+            pool.speeds[slot] = speed
+
+        ai_game.rng.setstate(self.rng_state)
+        if ai_game._starfield is not None:
+            ai_game._starfield.scroll_y = s[SCROLL_Y]
+
+    def _restore_fleet(self, ai_game):
+        """Copy the formation back and show its living aliens
+
+        Args:
+            ai_game (AlienInvasion): Game to restore
+        """
+        fleet, aliens = ai_game.fleet, ai_game.aliens
+        same_layout = (fleet.base_x == self.base_x
+                       and fleet.base_y == self.base_y)
+        if same_layout and fleet.alive == self.alive:
+            # The same aliens are alive, the sprites are already right
+            return
+
+        if not same_layout:
+            fleet.base_x[:] = self.base_x
+            fleet.base_y[:] = self.base_y
+            fleet.sprites = {}
+        fleet.columns = int(self.scalars[COLUMNS])
+        fleet.rows = int(self.scalars[ROWS])
+        fleet.alive[:] = self.alive
+        fleet.alive_count = self.alive.count(1)
+        fleet._extents_dirty = True
+
+        fleet.views = {}
+        aliens.empty()
+        sprites = fleet.sprites
+        for index, is_alive in enumerate(self.alive):
+            if is_alive:
+                alien = sprites.get(index)
+                if alien is None:
+                    ai_game._create_alien(index)
+                else:
+                    fleet.views[index] = alien
+                    aliens.add(alien)
+
+    def copy(self):
+        """Return an independent copy of this world state
+        """
+        world = WorldState.__new__(WorldState)
+        for name in _ARRAYS:
+            setattr(world, name, getattr(self, name)[:])
+        world.bullet_color = self.bullet_color
+        world.rng_state = self.rng_state
+        return world
+
+    def to_bytes(self) -> bytes:
+        """Return the world state as bytes, for saving to a file
+
+        The layout is the same on every platform, arrays are stored with
+        fixed item sizes in little endian byte order.
+        """
+        arrays = [getattr(self, name) for name in _ARRAYS]
+        if sys.byteorder == 'big':
+            arrays = [values[:] for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        rng_version, rng_words, gauss_next = self.rng_state
+        header = _HEADER.pack(_MAGIC, _VERSION,
+                              *(len(values) for values in arrays),
+                              rng_version,
+                              math.nan if gauss_next is None else gauss_next)
+        rng_words = array('Q', rng_words)
+        if sys.byteorder == 'big':
+            rng_words.byteswap()
+        return b''.join([header, _COLOR.pack(*self.bullet_color)]
+                        + [values.tobytes() for values in arrays]
+                        + [rng_words.tobytes()])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Create a world state from bytes returned by to_bytes()
+
+        Args:
+            data (bytes): Saved world state
+        """
+        magic, version, *lengths, rng_version, gauss_next = \
+            _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"not a version {_VERSION} world state")
+
+        world = cls()
+        pos = _HEADER.size
+        world.bullet_color = _COLOR.unpack_from(data, pos)
+        pos += _COLOR.size
+        for name, length in zip(_ARRAYS, lengths):
+            values = getattr(world, name)
+            del values[:]
+            size = length * values.itemsize
+            values.frombytes(data[pos:pos + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            pos += size
+
+        rng_words = array('Q')
+        rng_words.frombytes(data[pos:])
+        if sys.byteorder == 'big':
+            rng_words.byteswap()
+        world.rng_state = (rng_version, tuple(rng_words),
+                           None if math.isnan(gauss_next) else gauss_next)
+        return world